@@ -0,0 +1,488 @@
+#!/usr/bin/env python3
+"""Benchmark the Final Acts converter on synthetic PDFs.
+
+Generates Final Acts-style PDFs with PyMuPDF (TOC, "Res. N" page headers,
+keyword sections, numbered and lettered paragraphs) and times each stage of
+the conversion separately, reporting pages/s, documents/s and peak RSS.
+
+The parsed structure of each PDF is also loaded several times from its IR
+file, as for a multi-conference corpus, to report the memory it takes.
+
+With --regex it instead times the regex-heavy parser functions per call,
+with their precompiled patterns and with the re.sub()/re.split() calls on
+literal patterns they replaced.
+
+Usage:
+    python akn_benchmark.py [--pages 10 100 1000 10000] [--keep-dir <dir>]
+                            [--ir-copies N] [--json <file>]
+    python akn_benchmark.py --regex [--pdf ITU_Final_Acts_PP18.pdf] [--repeat N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, List
+
+import fitz  # PyMuPDF
+
+import akn_preview
+import itu_final_acts_to_akn as converter
+from itu_final_acts_to_akn import (
+    AKNGenerator,
+    FinalActs,
+    FinalActsParser,
+    PDFExtractor,
+    _peak_rss_mb,
+    _reset_peak_rss,
+    dump_ir,
+    load_ir,
+    write_xml,
+)
+
+
+# ---------------------------------------------------------------------------
+# Synthetic Final Acts PDF
+# ---------------------------------------------------------------------------
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842  # A4 in points
+TOP, BOTTOM, LEADING = 60, 780, 13
+
+SYNTH_PREAMBLE = ["considering", "recalling further", "noting with concern", "bearing in mind", "aware"]
+SYNTH_OPERATIVE = ["resolves", "instructs the Secretary-General", "invites Member States", "decides"]
+
+FILLER = (
+    "the importance of telecommunications and information and communication "
+    "technologies for sustainable development"
+)
+
+NOTE_REF = "^"  # splits a line around a superscript footnote marker "1"
+NOTE_TEXT = "1 These include the least developed countries, small island developing states and landlocked developing countries."
+
+
+def _synthetic_document_lines(number: int, doc_type: str, size: int,
+                               venue: str = "Dubai, 2018") -> List[tuple[str, str]]:
+    """Return (font, text) lines for one synthetic resolution/decision.
+
+    ``size`` scales the number of recitals and operative paragraphs so that
+    documents span anywhere from one to several pages.
+    """
+    lines: List[tuple[str, str]] = [
+        ("hebo", f"{doc_type} {number} (REV. {venue.upper()})"),
+        ("hebo", f"Synthetic topic {number}"),
+        ("", ""),
+        ("helv", f"The Plenipotentiary Conference of the International Telecommunication Union ({venue}),"),
+        ("", ""),
+    ]
+    for k, keyword in enumerate(SYNTH_PREAMBLE[: 1 + size % len(SYNTH_PREAMBLE)]):
+        lines.append(("heit", keyword))
+        for letter in "abc"[: 1 + (size + k) % 3]:
+            note = NOTE_REF if number % 4 == 0 and k == 0 and letter == "a" else ""
+            lines.append(("helv", f"{letter}) that developing countries{note} need {FILLER} ({number}.{k});"))
+        lines.append(("", ""))
+    for k, keyword in enumerate(SYNTH_OPERATIVE[: 1 + size % len(SYNTH_OPERATIVE)]):
+        lines.append(("heit", keyword))
+        lines.append(("", ""))
+        for para in range(1, 2 + size):
+            lines.append(("helv", str(para)))
+            lines.append(("helv", f"to ensure {FILLER},"))
+            lines.append(("helv", f"as set out in Resolution {max(3, number - 1)} (Rev. {venue}) and No. 58 of the Convention;"))
+            if para % 3 == 0:
+                lines.append(("helv", f"{para}.1 first sub-item on {FILLER};"))
+                lines.append(("helv", f"{para}.2 second sub-item on {FILLER};"))
+            elif para % 3 == 1:
+                lines.append(("helv", f"a) lettered item on {FILLER};"))
+                lines.append(("helv", f"b) lettered item on {FILLER};"))
+            lines.append(("", ""))
+    return lines
+
+
+def make_synthetic_final_acts(pdf_path: Path, n_pages: int, venue: str = "Dubai, 2018") -> int:
+    """Write a synthetic Final Acts PDF of about ``n_pages`` pages.
+
+    ``venue`` ("Place, Year") is used in titles, revisions and the enacting
+    formula, so several conferences can be simulated.
+
+    Returns the number of documents written.
+    """
+    doc = fitz.open()
+    fonts = {name: fitz.Font(name) for name in ("helv", "heit", "hebo")}
+    toc = [[1, "PART I – DECISIONS", 1]]
+    lines_per_page = (BOTTOM - TOP) // LEADING - 5  # minus the header block and footnote band
+    number = 0
+
+    while len(doc) < n_pages:
+        number += 1
+        doc_type, abbr = ("DECISION", "Dec") if number <= 2 else ("RESOLUTION", "Res")
+        if number == 3:
+            toc.append([1, "PART II – RESOLUTIONS", len(doc) + 1])
+        toc.append([2, f"{doc_type} {number} (Rev. {venue}) - Synthetic topic {number}", len(doc) + 1])
+
+        lines = _synthetic_document_lines(number, doc_type, size=number % 7, venue=venue)
+        for first in range(0, len(lines), lines_per_page):
+            page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+            writer = fitz.TextWriter(page.rect)
+            y = TOP
+            # Page header block in a smaller bold face, as in the real Final Acts
+            for text in (f"{abbr}. {number}", str(first // lines_per_page + 1), ""):
+                if text:
+                    writer.append((56, y), text, font=fonts["hebo"], fontsize=7)
+                y += LEADING
+            has_note = False
+            for font, text in lines[first:first + lines_per_page]:
+                before, ref, after = text.partition(NOTE_REF)
+                if before:
+                    writer.append((56, y), before, font=fonts[font], fontsize=9)
+                if ref:
+                    has_note = True
+                    writer.append((writer.last_point.x, y - 4), "1", font=fonts["helv"], fontsize=6)
+                    writer.append((writer.last_point.x, y), after, font=fonts[font], fontsize=9)
+                y += LEADING
+            if has_note:
+                marker, note = NOTE_TEXT.split(" ", 1)
+                writer.append((56, BOTTOM - 2 * LEADING - 3), marker, font=fonts["helv"], fontsize=6)
+                writer.append((62, BOTTOM - 2 * LEADING), note, font=fonts["helv"], fontsize=7)
+            writer.write_text(page)
+            if len(doc) >= n_pages:
+                break
+
+    doc.set_toc(toc)
+    doc.save(pdf_path, garbage=3, deflate=True)
+    doc.close()
+    return number
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+
+def _run_stage(name: str, func: Callable[[], object], pages: int, docs: int, results: List[dict]):
+    _reset_peak_rss()
+    start = time.perf_counter()
+    value = func()
+    elapsed = time.perf_counter() - start
+    results.append({
+        "stage": name,
+        "seconds": round(elapsed, 4),
+        "pages_per_s": round(pages / elapsed, 1) if elapsed else None,
+        "docs_per_s": round(docs / elapsed, 1) if elapsed else None,
+        "peak_rss_mb": _peak_rss_mb(),
+    })
+    return value
+
+
+def benchmark_pdf(pdf_path: Path, work_dir: Path) -> List[dict]:
+    """Time each conversion stage on one PDF."""
+    results: List[dict] = []
+    extractor = PDFExtractor(str(pdf_path))
+    doc_parser = FinalActsParser(extractor)
+    n_pages = len(extractor.doc)
+
+    entries = doc_parser._find_document_entries()
+    ranges = [
+        (entry, entries[i + 1]["page"] - 1 if i + 1 < len(entries) else n_pages - 1)
+        for i, entry in enumerate(entries)
+    ]
+    n_docs = len(ranges)
+
+    texts = _run_stage(
+        "PDFExtractor",
+        lambda: [extractor.extract_text_range(entry["page"], end) for entry, end in ranges],
+        n_pages, n_docs, results,
+    )
+
+    layout_extractor = PDFExtractor(str(pdf_path), layout=True)
+    _run_stage(
+        "PDFExtractor+layout",
+        lambda: [layout_extractor.extract_text_range(entry["page"], end) for entry, end in ranges],
+        n_pages, n_docs, results,
+    )
+    layout_extractor.close()
+
+    def parse() -> FinalActs:
+        acts = FinalActs()
+        for (entry, _), text in zip(ranges, texts):
+            doc_item = doc_parser._parse_document_text(text, entry)
+            if doc_item:
+                acts.parts.setdefault(entry.get("part", "other"), []).append(doc_item)
+        return acts
+
+    final_acts = _run_stage("FinalActsParser", parse, n_pages, n_docs, results)
+    dump_ir(final_acts, str(work_dir / f"{pdf_path.stem}.ir"))
+    root = _run_stage("AKNGenerator", AKNGenerator(final_acts).generate_collection, n_pages, n_docs, results)
+
+    xml_path = work_dir / f"{pdf_path.stem}_akn.xml"
+    _run_stage("write_xml", lambda root=root: write_xml(root, str(xml_path)), n_pages, n_docs, results)
+    del root
+
+    html_path = work_dir / f"{xml_path.stem}.html"
+    _run_stage("akn_preview", lambda: akn_preview._write_preview(xml_path, html_path), n_pages, n_docs, results)
+    extractor.close()
+
+    for row in results:
+        row.update(pages=n_pages, documents=n_docs)
+    return results
+
+
+def measure_ir_memory(ir_path: Path, copies: int) -> dict:
+    """Memory allocated by holding ``copies`` FinalActs loaded from ``ir_path``.
+
+    Each copy stands for one conference of a corpus: the IR file is read
+    ``copies`` times and all results are kept alive while tracemalloc
+    measures the Python heap.
+    """
+    tracemalloc.start()
+    try:
+        corpus = [load_ir(str(ir_path)) for _ in range(copies)]
+        allocated, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    n_docs = sum(len(docs) for acts in corpus for docs in acts.parts.values())
+    return {
+        "ir_copies": copies,
+        "documents": n_docs,
+        "allocated_mb": round(allocated / 2**20, 2),
+        "bytes_per_document": round(allocated / n_docs) if n_docs else None,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Regex micro-benchmark
+# ---------------------------------------------------------------------------
+
+# Functions timed by --regex, as (class, method name)
+REGEX_FUNCTIONS = [
+    (PDFExtractor, "_clean_page_text"),
+    (FinalActsParser, "_normalize_text"),
+    (FinalActsParser, "_clean_whitespace"),
+    (FinalActsParser, "_parse_preamble_section"),
+    (FinalActsParser, "_parse_operative_section"),
+    (FinalActsParser, "_parse_sub_paragraphs"),
+    (AKNGenerator, "_make_eid"),
+]
+
+# Converter patterns used by those functions
+HOT_PATH_PATTERNS = [
+    "PAGE_DOC_REF_RE", "PAGE_NUMBER_RE",
+    "NORMALIZE_RE", "WHITESPACE_RE", "LETTER_ITEM_SPLIT_RE", "PARAGRAPH_NUMBER_SPLIT_RE",
+    "INLINE_PARAGRAPH_NUMBER_SPLIT_RE", "DECIMAL_ITEM_SPLIT_RE",
+    "EID_INVALID_RE", "EID_UNDERSCORES_RE",
+]
+
+
+class _LiteralPattern:
+    """Stand-in for a compiled pattern that calls re.sub()/re.split()/re.match()
+    with the pattern string each time, as the converter used to.
+
+    With ``purge`` the re module cache is cleared before each call, as
+    happens when more patterns are in use than the cache holds.
+    """
+
+    def __init__(self, compiled: "re.Pattern", purge: bool = False):
+        self.pattern = compiled.pattern
+        self.flags = compiled.flags
+        self.purge = purge
+
+    def sub(self, repl, string):
+        if self.purge:
+            re.purge()
+        return re.sub(self.pattern, repl, string, flags=self.flags)
+
+    def split(self, string):
+        if self.purge:
+            re.purge()
+        return re.split(self.pattern, string, flags=self.flags)
+
+    def match(self, string):
+        if self.purge:
+            re.purge()
+        return re.match(self.pattern, string, flags=self.flags)
+
+
+def _record_calls(pdf_path: Path) -> dict:
+    """Arguments of every REGEX_FUNCTIONS call made while converting ``pdf_path``."""
+    calls = {name: [] for _, name in REGEX_FUNCTIONS}
+    originals = [(cls, name, cls.__dict__[name]) for cls, name in REGEX_FUNCTIONS]
+    for cls, name, func in originals:
+        def recorder(self, *args, _func=func, _calls=calls[name]):
+            _calls.append((self, args))
+            return _func(self, *args)
+        setattr(cls, name, recorder)
+    try:
+        extractor = PDFExtractor(str(pdf_path))
+        doc_parser = FinalActsParser(extractor)
+        acts = FinalActs()
+        for entry, end in doc_parser.document_ranges():
+            text = extractor.extract_text_range(entry["page"], end)
+            acts.parts.setdefault(entry["part"], []).append(doc_parser._parse_document_text(text, entry))
+        AKNGenerator(acts).generate_collection()
+        extractor.close()
+    finally:
+        for cls, name, func in originals:
+            setattr(cls, name, func)
+    return calls
+
+
+def _time_calls(cls, name: str, calls: list, repeat: int) -> float:
+    """Mean microseconds per call when replaying ``calls`` ``repeat`` times."""
+    func = getattr(cls, name)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for self, args in calls:
+            func(self, *args)
+    return (time.perf_counter() - start) / (len(calls) * repeat) * 1e6
+
+
+def benchmark_regex(pdf_path: Path, repeat: int = 20) -> List[dict]:
+    """Per-call cost of each REGEX_FUNCTIONS entry on the documents of ``pdf_path``.
+
+    Each function is replayed on the arguments it was called with during a
+    conversion, with the precompiled patterns ("compiled"), with literal
+    patterns found in the re cache ("re_cached") and with literal patterns
+    compiled on every call ("re_uncached").
+    """
+    with open(os.devnull, "w") as devnull:
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            calls = _record_calls(pdf_path)
+        finally:
+            sys.stdout = stdout
+
+    compiled = {name: getattr(converter, name) for name in HOT_PATH_PATTERNS}
+    rows = [{"function": f"{cls.__name__}.{name}", "calls": len(calls[name])}
+            for cls, name in REGEX_FUNCTIONS]
+    for column, purge in (("compiled", None), ("re_cached", False), ("re_uncached", True)):
+        if purge is not None:
+            for name, pattern in compiled.items():
+                setattr(converter, name, _LiteralPattern(pattern, purge))
+        try:
+            for row, (cls, name) in zip(rows, REGEX_FUNCTIONS):
+                row[f"{column}_us"] = round(_time_calls(cls, name, calls[name], repeat), 2) if calls[name] else None
+        finally:
+            for name, pattern in compiled.items():
+                setattr(converter, name, pattern)
+    return rows
+
+
+def _print_regex_table(rows: List[dict]) -> None:
+    print(f"{'function':<40} {'calls':>6} {'compiled us':>12} {'re cached us':>13} {'re uncached us':>15}")
+    for row in rows:
+        cells = [f"{row[k]:.2f}" if row[k] is not None else "n/a"
+                 for k in ("compiled_us", "re_cached_us", "re_uncached_us")]
+        print(f"{row['function']:<40} {row['calls']:>6} {cells[0]:>12} {cells[1]:>13} {cells[2]:>15}")
+
+
+def _print_table(rows: List[dict]) -> None:
+    print(f"{'pages':>7} {'docs':>6}  {'stage':<20} {'seconds':>9} {'pages/s':>10} {'docs/s':>9} {'peak RSS MB':>12}")
+    for row in rows:
+        rss = f"{row['peak_rss_mb']:.1f}" if row["peak_rss_mb"] is not None else "n/a"
+        print(
+            f"{row['pages']:>7} {row['documents']:>6}  {row['stage']:<20} "
+            f"{row['seconds']:>9.3f} {row['pages_per_s'] or 0:>10.1f} {row['docs_per_s'] or 0:>9.1f} {rss:>12}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the Final Acts converter on synthetic PDFs."
+    )
+    parser.add_argument(
+        "--pages",
+        type=int,
+        nargs="+",
+        default=[10, 100, 1000],
+        help="Synthetic PDF sizes to benchmark, in pages (default: 10 100 1000).",
+    )
+    parser.add_argument(
+        "--keep-dir",
+        type=Path,
+        default=None,
+        help="Keep generated PDFs and outputs in this directory instead of a temp dir.",
+    )
+    parser.add_argument(
+        "--ir-copies",
+        type=int,
+        default=4,
+        help="Conferences simulated by the IR memory measurement (default: 4).",
+    )
+    parser.add_argument(
+        "--regex",
+        action="store_true",
+        help="Time the regex-heavy parser functions per call instead of the conversion stages.",
+    )
+    parser.add_argument(
+        "--pdf",
+        type=Path,
+        default=None,
+        help="With --regex, use this PDF (e.g. the PP-18 Final Acts) instead of a "
+             "100-page synthetic one.",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=20,
+        help="With --regex, times each recorded call is replayed (default: 20).",
+    )
+    parser.add_argument(
+        "--json",
+        type=Path,
+        default=None,
+        help="Also write the results as JSON to this file.",
+    )
+    args = parser.parse_args()
+
+    if args.regex:
+        with tempfile.TemporaryDirectory() as tmp:
+            pdf_path = args.pdf
+            if pdf_path is None:
+                pdf_path = (args.keep_dir or Path(tmp)) / "synthetic_100.pdf"
+                pdf_path.parent.mkdir(parents=True, exist_ok=True)
+                make_synthetic_final_acts(pdf_path, 100)
+            rows = benchmark_regex(pdf_path, args.repeat)
+        print(f"Per-call cost on {pdf_path.name}:\n")
+        _print_regex_table(rows)
+        if args.json:
+            args.json.write_text(json.dumps(rows, indent=2), encoding="utf-8")
+            print(f"\nWritten: {args.json}")
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = (args.keep_dir or Path(tmp)).resolve()
+        work_dir.mkdir(parents=True, exist_ok=True)
+
+        rows: List[dict] = []
+        memory: List[dict] = []
+        for n_pages in args.pages:
+            pdf_path = work_dir / f"synthetic_{n_pages}.pdf"
+            n_docs = make_synthetic_final_acts(pdf_path, n_pages)
+            print(f"Generated: {pdf_path.name} ({n_pages} pages, {n_docs} documents)")
+            with open(os.devnull, "w") as devnull:
+                stdout, sys.stdout = sys.stdout, devnull
+                try:
+                    rows.extend(benchmark_pdf(pdf_path, work_dir))
+                finally:
+                    sys.stdout = stdout
+            memory.append({"pages": n_pages,
+                           **measure_ir_memory(work_dir / f"{pdf_path.stem}.ir", args.ir_copies)})
+
+    print()
+    _print_table(rows)
+    print(f"\n{'pages':>7} {'copies':>7} {'docs':>7} {'IR MB':>9} {'bytes/doc':>10}")
+    for row in memory:
+        print(f"{row['pages']:>7} {row['ir_copies']:>7} {row['documents']:>7} "
+              f"{row['allocated_mb']:>9.2f} {row['bytes_per_document'] or 0:>10}")
+    if args.json:
+        args.json.write_text(json.dumps({"stages": rows, "ir_memory": memory}, indent=2),
+                             encoding="utf-8")
+        print(f"\nWritten: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+"""Helpers shared by the AKN command-line tools."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterable, List
+
+
+def collect_xml_files(paths: Iterable[Path]) -> List[Path]:
+    """The given files, and the ``*.xml`` files of the given directories in sorted order."""
+    files: List[Path] = []
+    for path in paths:
+        files.extend(sorted(path.glob("*.xml")) if path.is_dir() else [path])
+    return files
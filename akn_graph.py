@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""Build and query the citation graph of converted AKN documents.
+
+Every ``<ref href>`` inside a ``<statement>`` is a citation from that
+statement's FRBR work to the referenced work. The graph is stored as
+CSR-style integer arrays (forward and reverse), so "which resolutions cite
+Resolution 71" is a slice of an array rather than a scan of the XML.
+
+Usage:
+    python akn_graph.py build <xml files or dirs> [-o citations.npz]
+    python akn_graph.py cited-by res-71 [--graph citations.npz]
+    python akn_graph.py cites "Resolution 2" [--graph citations.npz]
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+from pathlib import Path
+from typing import Iterable, Iterator, List, Tuple
+from xml.etree import ElementTree as ET
+
+import numpy as np
+
+from akn_common import collect_xml_files
+
+AKN = "{http://docs.oasis-open.org/legaldocml/ns/akn/3.0}"
+_WORK_URI = f"{AKN}meta/{AKN}identification/{AKN}FRBRWork/{AKN}FRBRuri"
+_WORK_NUMBER = f"{AKN}meta/{AKN}identification/{AKN}FRBRWork/{AKN}FRBRnumber"
+
+DEFAULT_GRAPH = "citations.npz"
+
+
+# ---------------------------------------------------------------------------
+# Edge extraction
+# ---------------------------------------------------------------------------
+
+def iter_citations(xml_path: Path) -> Iterator[Tuple[str, str, List[str]]]:
+    """Yield (work IRI, label, cited work IRIs) for each statement in a file.
+
+    Works on both the collection and the individual files. Statements are
+    read with iterparse and cleared once processed.
+    """
+    for _, elem in ET.iterparse(str(xml_path), events=("end",)):
+        if elem.tag != f"{AKN}statement":
+            continue
+        uri = elem.find(_WORK_URI)
+        if uri is not None:
+            number = elem.find(_WORK_NUMBER)
+            label = number.get("showAs") if number is not None else ""
+            cited = [ref.get("href", "").split("#", 1)[0] for ref in elem.iter(f"{AKN}ref")]
+            yield uri.get("value"), label or "", [c for c in cited if c]
+        elem.clear()
+
+
+# ---------------------------------------------------------------------------
+# Graph
+# ---------------------------------------------------------------------------
+
+def _csr(rows: np.ndarray, cols: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """indptr/indices of the (rows, cols) edge list, columns sorted per row."""
+    order = np.lexsort((cols, rows))
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+    return indptr, cols[order].astype(np.int32)
+
+
+class CitationGraph:
+    """Works and their citations as forward and reverse CSR arrays.
+
+    ``nodes[i]`` is the work IRI of node ``i`` and ``labels[i]`` its
+    ``FRBRnumber/@showAs`` (empty for works only known as a citation
+    target). The works cited by node ``i`` are
+    ``cites_indices[cites_indptr[i]:cites_indptr[i + 1]]``; the works
+    citing it are the same slice of the ``cited_by_*`` arrays.
+    """
+
+    def __init__(self, nodes: np.ndarray, labels: np.ndarray,
+                 cites_indptr: np.ndarray, cites_indices: np.ndarray,
+                 cited_by_indptr: np.ndarray, cited_by_indices: np.ndarray):
+        self.nodes = nodes
+        self.labels = labels
+        self.cites_indptr = cites_indptr
+        self.cites_indices = cites_indices
+        self.cited_by_indptr = cited_by_indptr
+        self.cited_by_indices = cited_by_indices
+        self._ids = {iri: i for i, iri in enumerate(nodes.tolist())}
+        self._by_number = {}  # FRBR number ("res-71") -> node ids, across conferences
+        for i, iri in enumerate(nodes.tolist()):
+            self._by_number.setdefault(iri.rsplit("/", 1)[-1], []).append(i)
+
+    @classmethod
+    def build(cls, xml_files: Iterable[Path]) -> "CitationGraph":
+        ids: dict = {}
+        labels: dict = {}
+        src: List[int] = []
+        dst: List[int] = []
+        for xml_path in xml_files:
+            for work, label, cited in iter_citations(xml_path):
+                i = ids.setdefault(work, len(ids))
+                if label:
+                    labels[i] = label
+                for target in cited:
+                    j = ids.setdefault(target, len(ids))
+                    if j != i:
+                        src.append(i)
+                        dst.append(j)
+
+        n = len(ids)
+        edges = np.unique(np.array([src, dst], dtype=np.int32).reshape(2, -1), axis=1)
+        cites = _csr(edges[0], edges[1], n)
+        cited_by = _csr(edges[1], edges[0], n)
+        nodes = np.array(list(ids), dtype=str)
+        label_array = np.array([labels.get(i, "") for i in range(n)], dtype=str)
+        return cls(nodes, label_array, *cites, *cited_by)
+
+    def save(self, path: Path):
+        np.savez(
+            path,
+            nodes=self.nodes,
+            labels=self.labels,
+            cites_indptr=self.cites_indptr,
+            cites_indices=self.cites_indices,
+            cited_by_indptr=self.cited_by_indptr,
+            cited_by_indices=self.cited_by_indices,
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "CitationGraph":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                data["nodes"], data["labels"],
+                data["cites_indptr"], data["cites_indices"],
+                data["cited_by_indptr"], data["cited_by_indices"],
+            )
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.cites_indices)
+
+    def node_ids(self, work: str) -> List[int]:
+        """Nodes matching a work IRI, an FRBR number ("res-71") or "Resolution 71"."""
+        if work in self._ids:
+            return [self._ids[work]]
+        m = re.fullmatch(r"\s*(resolution|decision|recommendation)\s+(\S+)\s*", work, re.IGNORECASE)
+        number = f"{m.group(1).lower()[:3]}-{m.group(2)}" if m else work.strip()
+        return self._by_number.get(number, [])
+
+    def _neighbours(self, work: str, indptr: np.ndarray, indices: np.ndarray) -> List[str]:
+        found = set()
+        for i in self.node_ids(work):
+            found.update(indices[indptr[i]:indptr[i + 1]].tolist())
+        return [self.nodes[j] for j in sorted(found)]
+
+    def cites(self, work: str) -> List[str]:
+        """Work IRIs cited by ``work``."""
+        return self._neighbours(work, self.cites_indptr, self.cites_indices)
+
+    def cited_by(self, work: str) -> List[str]:
+        """Work IRIs of the documents citing ``work``."""
+        return self._neighbours(work, self.cited_by_indptr, self.cited_by_indices)
+
+    def label(self, iri: str) -> str:
+        i = self._ids.get(iri)
+        return str(self.labels[i]) if i is not None else ""
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Build and query the citation graph of AKN documents."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="Build the graph from AKN XML files.")
+    build.add_argument("inputs", type=Path, nargs="+", help="XML files or directories of XML files.")
+    build.add_argument(
+        "-o", "--output",
+        type=Path,
+        default=Path(DEFAULT_GRAPH),
+        help=f"Graph file to write (default: {DEFAULT_GRAPH}).",
+    )
+
+    for name, help_text in (("cites", "List the works cited by a document."),
+                            ("cited-by", "List the documents citing a work.")):
+        query = commands.add_parser(name, help=help_text)
+        query.add_argument("work", help='Work IRI, FRBR number ("res-71") or "Resolution 71".')
+        query.add_argument(
+            "--graph",
+            type=Path,
+            default=Path(DEFAULT_GRAPH),
+            help=f"Graph file written by 'build' (default: {DEFAULT_GRAPH}).",
+        )
+    args = parser.parse_args()
+
+    if args.command == "build":
+        xml_files = collect_xml_files(args.inputs)
+        if not xml_files:
+            raise SystemExit("No XML files found.")
+        graph = CitationGraph.build(xml_files)
+        graph.save(args.output)
+        print(f"Works: {len(graph.nodes)}, citations: {graph.edge_count}")
+        print(f"Written: {args.output}")
+        return
+
+    graph = CitationGraph.load(args.graph)
+    if not graph.node_ids(args.work):
+        raise SystemExit(f"Unknown work: {args.work}")
+    results = graph.cites(args.work) if args.command == "cites" else graph.cited_by(args.work)
+    for iri in results:
+        label = graph.label(iri)
+        print(f"{iri}  {label}" if label else iri)
+    if not results:
+        print("(none)")
+
+
+if __name__ == "__main__":
+    main()
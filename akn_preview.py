@@ -6,22 +6,50 @@ from __future__ import annotations
 import argparse
 import html
 import re
+import shutil
+import tempfile
 import webbrowser
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
 from typing import List
 from xml.etree import ElementTree as ET
 
+from akn_common import collect_xml_files
+
 AKN_NS = {"akn": "http://docs.oasis-open.org/legaldocml/ns/akn/3.0"}
+_AUTHORIAL_NOTE = f"{{{AKN_NS['akn']}}}authorialNote"
 
 
 def _clean_text(value: str) -> str:
     return re.sub(r"\s+", " ", value).strip()
 
 
+def _iter_text(node: ET.Element):
+    """itertext() that gives the marker of an <authorialNote> instead of its text."""
+    if node.text:
+        yield node.text
+    for child in node:
+        if child.tag == _AUTHORIAL_NOTE:
+            yield f"[{child.get('marker', '')}]"
+        else:
+            yield from _iter_text(child)
+        if child.tail:
+            yield child.tail
+
+
 def _node_text(node: ET.Element | None) -> str:
     if node is None:
         return ""
-    return _clean_text("".join(node.itertext()))
+    return _clean_text("".join(_iter_text(node)))
+
+
+def _render_notes(statement: ET.Element) -> str:
+    notes = []
+    for note in statement.iter(_AUTHORIAL_NOTE):
+        text = _clean_text("".join(note.itertext()))
+        notes.append(f'<p class="note">[{html.escape(note.get("marker", ""))}] {html.escape(text)}</p>')
+    return "".join(notes)
 
 
 def _statement_heading(statement: ET.Element, fallback: str) -> str:
@@ -65,6 +93,16 @@ def _render_paragraph(paragraph: ET.Element) -> str:
     return "\n".join(rendered)
 
 
+def _render_table(table: ET.Element) -> str:
+    rows = []
+    for tr in table.findall("akn:tr", AKN_NS):
+        cells = "".join(
+            f"<td>{html.escape(_node_text(td))}</td>" for td in tr.findall("akn:td", AKN_NS)
+        )
+        rows.append(f"<tr>{cells}</tr>")
+    return f"<table>{''.join(rows)}</table>"
+
+
 def _render_statement_sections(
     statement: ET.Element, section_heading_tag: str = "h3"
 ) -> tuple[str, str]:
@@ -84,7 +122,12 @@ def _render_statement_sections(
         recitals_html.append("</ul>")
 
     body_html: List[str] = []
-    for section in statement.findall("./akn:mainBody/akn:hcontainer", AKN_NS):
+    for section in statement.findall("./akn:mainBody/*", AKN_NS):
+        if section.tag == f"{{{AKN_NS['akn']}}}table":
+            body_html.append(_render_table(section))
+            continue
+        if section.tag != f"{{{AKN_NS['akn']}}}hcontainer":
+            continue
         section_title = _node_text(section.find("akn:heading", AKN_NS))
         if section_title:
             body_html.append(f"<{section_heading_tag}>{html.escape(section_title)}</{section_heading_tag}>")
@@ -93,6 +136,7 @@ def _render_statement_sections(
 
     recitals_block = "".join(recitals_html) if recitals_html else "<p>(No preamble extracted)</p>"
     body_block = "".join(body_html) if body_html else "<p>(No operative content extracted)</p>"
+    body_block += _render_notes(statement)
     return recitals_block, body_block
 
 
@@ -116,6 +160,9 @@ def _base_style() -> str:
       margin-right: 0.35rem;
     }
     ul { padding-left: 1.4rem; }
+    table { border-collapse: collapse; margin: 1rem 0; }
+    td { border: 1px solid #9996; padding: 0.25rem 0.6rem; vertical-align: top; }
+    .note { font-size: 0.9rem; opacity: 0.85; }
     li { margin-bottom: 0.35rem; }
     .source {
       margin-top: 2.25rem;
@@ -130,10 +177,19 @@ def _base_style() -> str:
     """
 
 
-def _render_statement_page(statement: ET.Element, source_label: str, fallback_title: str) -> tuple[str, str]:
+def _render_statement_page(
+    statement: ET.Element,
+    source_label: str,
+    fallback_title: str,
+    back_link: tuple[str, str] | None = None,
+) -> tuple[str, str]:
     heading = _statement_heading(statement, fallback_title)
     subtitle = _statement_subtitle(statement)
     recitals_block, body_block = _render_statement_sections(statement, section_heading_tag="h3")
+    back = ""
+    if back_link is not None:
+        href, label = back_link
+        back = f'<p class="back"><a href="{html.escape(href)}">{html.escape(label)}</a></p>\n  '
 
     page = f"""<!doctype html>
 <html lang="en">
@@ -144,7 +200,7 @@ def _render_statement_page(statement: ET.Element, source_label: str, fallback_ti
   <style>{_base_style()}</style>
 </head>
 <body>
-  <h1>{html.escape(heading)}</h1>
+  {back}<h1>{html.escape(heading)}</h1>
   <p>{html.escape(subtitle)}</p>
   <h2>Preamble</h2>
   {recitals_block}
@@ -157,31 +213,23 @@ def _render_statement_page(statement: ET.Element, source_label: str, fallback_ti
     return heading, page
 
 
-def _render_collection_page(collection: ET.Element, xml_path: Path) -> tuple[str, str]:
-    frbr_number = collection.find(
-        ".//akn:identification/akn:FRBRWork/akn:FRBRnumber", AKN_NS
-    )
-    heading = (
+def _frbr_heading(frbr_number: ET.Element | None, fallback: str) -> str:
+    return (
         (frbr_number.get("showAs") if frbr_number is not None else None)
         or (frbr_number.get("value") if frbr_number is not None else None)
-        or xml_path.stem
-    )
-    collection_subtitle = _node_text(
-        collection.find("./akn:preface/akn:longTitle", AKN_NS)
+        or fallback
     )
 
-    blocks: List[str] = []
-    toc_entries: List[str] = []
-    statements = collection.findall("./akn:components/akn:component/akn:statement", AKN_NS)
-    for idx, statement in enumerate(statements, start=1):
-        title = _statement_heading(statement, f"Document {idx}")
-        subtitle = _statement_subtitle(statement)
-        anchor = f"doc-{idx}"
-        toc_entries.append(f'<li><a href="#{anchor}">{html.escape(title)}</a></li>')
-
-        recitals_block, body_block = _render_statement_sections(statement, section_heading_tag="h4")
-        blocks.append(
-            f"""
+
+def _render_collection_article(statement: ET.Element, idx: int) -> tuple[str, str]:
+    """Render one embedded statement; returns (TOC entry, article HTML)."""
+    title = _statement_heading(statement, f"Document {idx}")
+    subtitle = _statement_subtitle(statement)
+    anchor = f"doc-{idx}"
+    toc_entry = f'<li><a href="#{anchor}">{html.escape(title)}</a></li>'
+
+    recitals_block, body_block = _render_statement_sections(statement, section_heading_tag="h4")
+    article = f"""
 <article id="{anchor}" class="doc-card">
   <h3>{html.escape(title)}</h3>
   <p>{html.escape(subtitle)}</p>
@@ -192,12 +240,12 @@ def _render_collection_page(collection: ET.Element, xml_path: Path) -> tuple[str
   <p class="back"><a href="#top">Back to documents list</a></p>
 </article>
 """
-        )
+    return toc_entry, article
 
-    toc = "".join(toc_entries) if toc_entries else "<li>(No embedded statements found)</li>"
-    body = "".join(blocks) if blocks else "<p>(No embedded statements found)</p>"
 
-    page = f"""<!doctype html>
+def _collection_page_head(heading: str, collection_subtitle: str, toc_entries: List[str]) -> str:
+    toc = "".join(toc_entries) if toc_entries else "<li>(No embedded statements found)</li>"
+    return f"""<!doctype html>
 <html lang="en">
 <head>
   <meta charset="utf-8">
@@ -213,29 +261,171 @@ def _render_collection_page(collection: ET.Element, xml_path: Path) -> tuple[str
     <h2>Documents in this collection</h2>
     <ul>{toc}</ul>
   </section>
-  {body}
-  <p class="source">Source XML: {html.escape(xml_path.name)}</p>
+  """
+
+
+def _collection_page_tail(source_name: str) -> str:
+    return f"""
+  <p class="source">Source XML: {html.escape(source_name)}</p>
 </body>
 </html>
 """
-    return heading, page
 
 
-def _render_xml_file(xml_path: Path) -> tuple[str, str]:
-    root = ET.parse(xml_path).getroot()
-    statement = root.find("akn:statement", AKN_NS)
-    if statement is not None:
-        return _render_statement_page(
-            statement=statement, source_label=xml_path.name, fallback_title=xml_path.stem
-        )
+_NO_STATEMENTS = "<p>(No embedded statements found)</p>"
 
-    collection = root.find("akn:documentCollection", AKN_NS)
-    if collection is not None:
-        return _render_collection_page(collection, xml_path)
 
-    raise ValueError(
-        f"{xml_path.name} is not supported. Expected <statement> or <documentCollection>."
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+_COLLECTION = ["akomaNtoso", "documentCollection"]
+_COLLECTION_FRBR_NUMBER = _COLLECTION + ["meta", "identification", "FRBRWork", "FRBRnumber"]
+_COLLECTION_LONG_TITLE = _COLLECTION + ["preface", "longTitle"]
+_COLLECTION_COMPONENT = _COLLECTION + ["components", "component"]
+_COLLECTION_STATEMENT = _COLLECTION_COMPONENT + ["statement"]
+
+
+def _write_preview(xml_path: Path, out_path: Path) -> str:
+    """Render ``xml_path`` to ``out_path`` and return the page title.
+
+    The file is read with iterparse. A collection's embedded statements are
+    rendered one by one as soon as each has been parsed, spooled to a
+    temporary file and released, so neither the whole DOM nor the whole HTML
+    page is held in memory.
+    """
+    tags: List[str] = []
+    heading: str | None = None
+    subtitle = ""
+    toc_entries: List[str] = []
+    components: ET.Element | None = None
+    is_collection = False
+
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as spool:
+        for event, elem in ET.iterparse(xml_path, events=("start", "end")):
+            if event == "start":
+                tags.append(_local_name(elem.tag))
+                if tags == _COLLECTION:
+                    is_collection = True
+                elif tags == _COLLECTION_COMPONENT[:-1]:
+                    components = elem
+                continue
+
+            if tags == ["akomaNtoso", "statement"]:
+                title, page = _render_statement_page(
+                    statement=elem, source_label=xml_path.name, fallback_title=xml_path.stem
+                )
+                out_path.write_text(page, encoding="utf-8")
+                return title
+            if tags == _COLLECTION_FRBR_NUMBER and heading is None:
+                heading = _frbr_heading(elem, xml_path.stem)
+            elif tags == _COLLECTION_LONG_TITLE:
+                subtitle = _node_text(elem)
+            elif tags == _COLLECTION_STATEMENT:
+                toc_entry, article = _render_collection_article(elem, len(toc_entries) + 1)
+                toc_entries.append(toc_entry)
+                spool.write(article)
+            elif tags == _COLLECTION_COMPONENT and components is not None:
+                components.remove(elem)
+            tags.pop()
+
+        if not is_collection:
+            raise ValueError(
+                f"{xml_path.name} is not supported. Expected <statement> or <documentCollection>."
+            )
+
+        heading = heading or xml_path.stem
+        spool.seek(0)
+        with out_path.open("w", encoding="utf-8") as out:
+            out.write(_collection_page_head(heading, subtitle, toc_entries))
+            if toc_entries:
+                shutil.copyfileobj(spool, out)
+            else:
+                out.write(_NO_STATEMENTS)
+            out.write(_collection_page_tail(xml_path.name))
+    return heading
+
+
+def _render_statement_file(
+    statement_xml: bytes, out_path: str, source_label: str, fallback_title: str, back_link: tuple[str, str]
+) -> str:
+    """Process-pool entry point: render one serialised statement to its own page."""
+    statement = ET.fromstring(statement_xml)
+    title, page = _render_statement_page(statement, source_label, fallback_title, back_link)
+    Path(out_path).write_text(page, encoding="utf-8")
+    return title
+
+
+def _write_split_preview(xml_path: Path, out_path: Path, jobs: int = 1) -> str:
+    """Render a collection as one page per statement plus a TOC page.
+
+    Statement pages go to ``<output dir>/<xml stem>/<document>.html`` and are
+    rendered across ``jobs`` processes; ``out_path`` becomes a lightweight
+    page linking to them. Files that are not collections are rendered as
+    usual by ``_write_preview``.
+    """
+    tags: List[str] = []
+    heading: str | None = None
+    subtitle = ""
+    toc_entries: List[str] = []
+    components: ET.Element | None = None
+    component_eid = ""
+    is_collection = False
+
+    page_dir = out_path.parent / xml_path.stem
+    back_link = (f"../{out_path.name}", "Back to documents list")
+    pool = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    futures = []
+    try:
+        for event, elem in ET.iterparse(xml_path, events=("start", "end")):
+            if event == "start":
+                tags.append(_local_name(elem.tag))
+                if tags == _COLLECTION:
+                    is_collection = True
+                    page_dir.mkdir(parents=True, exist_ok=True)
+                elif tags == _COLLECTION_COMPONENT[:-1]:
+                    components = elem
+                elif tags == _COLLECTION_COMPONENT:
+                    component_eid = elem.get("eId", "")
+                continue
+
+            if tags == ["akomaNtoso", "statement"]:
+                break
+            if tags == _COLLECTION_FRBR_NUMBER and heading is None:
+                heading = _frbr_heading(elem, xml_path.stem)
+            elif tags == _COLLECTION_LONG_TITLE:
+                subtitle = _node_text(elem)
+            elif tags == _COLLECTION_STATEMENT:
+                idx = len(toc_entries) + 1
+                name = component_eid.removeprefix("cmp_") if component_eid else f"doc-{idx}"
+                title = _statement_heading(elem, f"Document {idx}")
+                href = f"{xml_path.stem}/{name}.html"
+                toc_entries.append(f'<li><a href="{html.escape(href)}">{html.escape(title)}</a></li>')
+                args = (ET.tostring(elem), str(page_dir / f"{name}.html"), xml_path.name, title, back_link)
+                if pool is not None:
+                    futures.append(pool.submit(_render_statement_file, *args))
+                else:
+                    _render_statement_file(*args)
+            elif tags == _COLLECTION_COMPONENT and components is not None:
+                components.remove(elem)
+            tags.pop()
+        for future in futures:
+            future.result()
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    if not is_collection:
+        return _write_preview(xml_path, out_path)
+
+    heading = heading or xml_path.stem
+    out_path.write_text(
+        _collection_page_head(heading, subtitle, toc_entries)
+        + ("" if toc_entries else _NO_STATEMENTS)
+        + _collection_page_tail(xml_path.name),
+        encoding="utf-8",
     )
+    return heading
 
 
 def _write_index(items: List[tuple[str, str]], output_dir: Path) -> Path:
@@ -274,10 +464,19 @@ def _write_index(items: List[tuple[str, str]], output_dir: Path) -> Path:
     return index_path
 
 
-def _collect_xml_files(input_dir: Path, input_file: Path | None) -> List[Path]:
-    if input_file is not None:
-        return [input_file.resolve()]
-    return sorted(input_dir.resolve().glob("*.xml"))
+def _render_preview_job(
+    xml_file: Path, output_dir: Path, split: bool, jobs: int
+) -> tuple[str, str | None, str | None]:
+    """Render one XML file; returns (output filename, title, error message)."""
+    out_name = f"{xml_file.stem}.html"
+    try:
+        if split:
+            title = _write_split_preview(xml_file, output_dir / out_name, jobs=jobs)
+        else:
+            title = _write_preview(xml_file, output_dir / out_name)
+    except (ET.ParseError, ValueError) as exc:
+        return out_name, None, str(exc)
+    return out_name, title, None
 
 
 def main() -> None:
@@ -303,6 +502,18 @@ def main() -> None:
         default=script_dir / "preview_html",
         help="Directory where HTML files are written (default: preview_html).",
     )
+    parser.add_argument(
+        "--split",
+        action="store_true",
+        help="Write one page per statement of a collection, plus a TOC page.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes used to render XML files, or the statement pages "
+        "of a single file with --split (default: 1).",
+    )
     parser.add_argument(
         "--open",
         action="store_true",
@@ -313,19 +524,27 @@ def main() -> None:
     output_dir = args.output_dir.resolve()
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    xml_files = _collect_xml_files(args.input_dir, args.input_file)
+    xml_files = collect_xml_files([(args.input_file or args.input_dir).resolve()])
     if not xml_files:
         raise SystemExit(f"No XML files found in: {args.input_dir.resolve()}")
 
+    if args.jobs > 1 and len(xml_files) > 1:
+        # Parallelise across files; each file then renders in a single process.
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            results = list(pool.map(
+                _render_preview_job, xml_files, repeat(output_dir), repeat(args.split), repeat(1)
+            ))
+    else:
+        results = [
+            _render_preview_job(xml_file, output_dir, args.split, args.jobs)
+            for xml_file in xml_files
+        ]
+
     index_items: List[tuple[str, str]] = []
-    for xml_file in xml_files:
-        try:
-            title, page = _render_xml_file(xml_file)
-        except (ET.ParseError, ValueError) as exc:
-            print(f"Skipped: {xml_file.name} ({exc})")
+    for xml_file, (out_name, title, error) in zip(xml_files, results):
+        if error is not None:
+            print(f"Skipped: {xml_file.name} ({error})")
             continue
-        out_name = f"{xml_file.stem}.html"
-        (output_dir / out_name).write_text(page, encoding="utf-8")
         index_items.append((title, out_name))
         print(f"Written: {output_dir / out_name}")
 
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""Full-text search over the recitals and paragraphs of AKN documents.
+
+The indexer streams statements from collection or individual XML files and
+records every word of each recital (``rec_5``), operative paragraph
+(``hcont_resolves__para_3``) and point (``hcont_resolves__para_4__point_4-1``)
+as a positional posting.
+Postings are stored as sorted NumPy arrays in an index directory and
+memory-mapped at query time, so a query only touches the postings of its
+own terms.
+
+Usage:
+    python akn_search.py build <xml files or dirs> [-o search_index]
+    python akn_search.py query 'spectrum "developing countries"' [--index search_index]
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+from pathlib import Path
+from typing import Iterable, Iterator, List, Tuple
+from xml.etree import ElementTree as ET
+
+import numpy as np
+
+from akn_common import collect_xml_files
+
+AKN = "{http://docs.oasis-open.org/legaldocml/ns/akn/3.0}"
+_WORK_URI = f"{AKN}meta/{AKN}identification/{AKN}FRBRWork/{AKN}FRBRuri"
+_WORK_NUMBER = f"{AKN}meta/{AKN}identification/{AKN}FRBRWork/{AKN}FRBRnumber"
+_UNIT_TAGS = {f"{AKN}recital", f"{AKN}paragraph", f"{AKN}point"}
+_TEXT_TAGS = {f"{AKN}p", f"{AKN}content"}
+
+DEFAULT_INDEX = "search_index"
+WORD_RE = re.compile(r"\w+")
+QUERY_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+# A posting is one int64: unit id in the high bits, word position below.
+POSITION_BITS = 24
+
+
+# ---------------------------------------------------------------------------
+# Indexing
+# ---------------------------------------------------------------------------
+
+def _tokens(text: str) -> List[str]:
+    return WORD_RE.findall(text.lower())
+
+
+def iter_units(xml_path: Path) -> Iterator[Tuple[str, str, List[Tuple[str, str]]]]:
+    """Yield (work IRI, label, [(eId, text), ...]) for each statement in a file.
+
+    A unit's text is that of its own <p>/<content> children, so a paragraph
+    with a list does not repeat the text of its points.
+    """
+    for _, elem in ET.iterparse(str(xml_path), events=("end",)):
+        if elem.tag != f"{AKN}statement":
+            continue
+        uri = elem.find(_WORK_URI)
+        if uri is not None:
+            number = elem.find(_WORK_NUMBER)
+            label = number.get("showAs") if number is not None else ""
+            units = []
+            for unit in elem.iter():
+                if unit.tag in _UNIT_TAGS and unit.get("eId"):
+                    text = " ".join(
+                        "".join(child.itertext()) for child in unit if child.tag in _TEXT_TAGS
+                    )
+                    units.append((unit.get("eId"), text))
+            yield uri.get("value"), label or "", units
+        elem.clear()
+
+
+def build_index(xml_files: Iterable[Path], index_dir: Path) -> dict:
+    """Index ``xml_files`` into ``index_dir`` and return counts.
+
+    Files written (all .npy, readable with mmap):
+      vocab           sorted terms
+      offsets         postings of vocab[i] are postings[offsets[i]:offsets[i + 1]]
+      postings        (unit id << POSITION_BITS | position), sorted per term
+      unit_doc, unit_eid   document index and eId of each unit
+      docs, doc_labels     work IRI and FRBRnumber/@showAs of each document
+    """
+    postings: dict = {}
+    docs: dict = {}
+    doc_labels: List[str] = []
+    unit_doc: List[int] = []
+    unit_eid: List[str] = []
+
+    for xml_path in xml_files:
+        for work, label, units in iter_units(xml_path):
+            if work in docs:  # same statement in the collection and individual files
+                continue
+            docs[work] = len(docs)
+            doc_labels.append(label)
+            # Files from older converter versions repeat eIds such as para_1
+            # across the sections of a statement, so every unit is indexed,
+            # not every distinct eId
+            for eid, text in units:
+                unit_id = len(unit_eid)
+                unit_doc.append(docs[work])
+                unit_eid.append(eid)
+                base = unit_id << POSITION_BITS
+                for pos, token in enumerate(_tokens(text)):
+                    postings.setdefault(token, []).append(base | pos)
+
+    vocab = sorted(postings)
+    lengths = np.fromiter((len(postings[t]) for t in vocab), dtype=np.int64, count=len(vocab))
+    offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    flat = np.fromiter(
+        (key for t in vocab for key in postings[t]), dtype=np.int64, count=int(offsets[-1])
+    )
+
+    index_dir.mkdir(parents=True, exist_ok=True)
+    arrays = {
+        "vocab": np.array(vocab, dtype=str),
+        "offsets": offsets,
+        "postings": flat,
+        "unit_doc": np.array(unit_doc, dtype=np.int32),
+        "unit_eid": np.array(unit_eid, dtype=str),
+        "docs": np.array(list(docs), dtype=str),
+        "doc_labels": np.array(doc_labels, dtype=str),
+    }
+    for name, array in arrays.items():
+        np.save(index_dir / f"{name}.npy", array)
+    return {"documents": len(docs), "units": len(unit_eid), "terms": len(vocab), "postings": len(flat)}
+
+
+# ---------------------------------------------------------------------------
+# Querying
+# ---------------------------------------------------------------------------
+
+class SearchIndex:
+    """Memory-mapped index written by ``build_index``."""
+
+    def __init__(self, index_dir: Path):
+        def load(name):
+            return np.load(index_dir / f"{name}.npy", mmap_mode="r")
+
+        self.vocab = load("vocab")
+        self.offsets = load("offsets")
+        self.postings = load("postings")
+        self.unit_doc = load("unit_doc")
+        self.unit_eid = load("unit_eid")
+        self.docs = load("docs")
+        self.doc_labels = load("doc_labels")
+
+    def term_postings(self, term: str) -> np.ndarray:
+        i = int(np.searchsorted(self.vocab, term))
+        if i < len(self.vocab) and self.vocab[i] == term:
+            return np.asarray(self.postings[self.offsets[i]:self.offsets[i + 1]])
+        return np.empty(0, dtype=np.int64)
+
+    def phrase_units(self, words: List[str]) -> np.ndarray:
+        """Unit ids containing ``words`` at consecutive positions."""
+        keys = self.term_postings(words[0])
+        for k, word in enumerate(words[1:], 1):
+            if not len(keys):
+                break
+            # word k of the phrase sits k positions after word 0 in the same unit
+            keys = np.intersect1d(keys, self.term_postings(word) - k, assume_unique=True)
+        return np.unique(keys >> POSITION_BITS)
+
+    def search(self, query: str) -> List[Tuple[str, str, str]]:
+        """(work IRI, label, eId) of the units matching every word and "phrase"."""
+        units = None
+        for phrase, word in QUERY_RE.findall(query):
+            words = _tokens(phrase or word)
+            if not words:
+                continue
+            found = self.phrase_units(words)
+            units = found if units is None else np.intersect1d(units, found, assume_unique=True)
+            if not len(units):
+                break
+        if units is None or not len(units):
+            return []
+        doc_ids = self.unit_doc[units]
+        return list(zip(
+            self.docs[doc_ids].tolist(), self.doc_labels[doc_ids].tolist(), self.unit_eid[units].tolist()
+        ))
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Full-text search over the recitals and paragraphs of AKN documents."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="Index AKN XML files.")
+    build.add_argument("inputs", type=Path, nargs="+", help="XML files or directories of XML files.")
+    build.add_argument(
+        "-o", "--output",
+        type=Path,
+        default=Path(DEFAULT_INDEX),
+        help=f"Index directory to write (default: {DEFAULT_INDEX}).",
+    )
+
+    query = commands.add_parser("query", help="Search the index.")
+    query.add_argument("query", help='Words and "quoted phrases"; all must occur in the same unit.')
+    query.add_argument(
+        "--index",
+        type=Path,
+        default=Path(DEFAULT_INDEX),
+        help=f"Index directory written by 'build' (default: {DEFAULT_INDEX}).",
+    )
+    query.add_argument("--limit", type=int, default=50, help="Maximum hits to print (default: 50).")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        xml_files = collect_xml_files(args.inputs)
+        if not xml_files:
+            raise SystemExit("No XML files found.")
+        counts = build_index(xml_files, args.output)
+        print(", ".join(f"{k}: {v}" for k, v in counts.items()))
+        print(f"Written: {args.output}")
+        return
+
+    hits = SearchIndex(args.index).search(args.query)
+    for work, label, eid in hits[:args.limit]:
+        print(f"{label or work}  #{eid}")
+    print(f"{len(hits)} hit(s)")
+
+
+if __name__ == "__main__":
+    main()
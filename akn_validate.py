@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Validate AKN XML files against akomantoso30.xsd.
+
+Every <statement> (of a collection or an individual file) is validated on
+its own and errors are reported against the eId of the nearest enclosing
+element. The schema is compiled once per process, not once per file.
+
+Usage:
+    python akn_validate.py <xml files or dirs> [--jobs N] [--json report.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from akn_common import collect_xml_files
+from itu_final_acts_to_akn import SCHEMA_PATH, print_validation_report, validate_files
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Validate AKN XML files against the Akoma Ntoso 3.0 schema."
+    )
+    parser.add_argument("inputs", type=Path, nargs="+", help="XML files or directories of XML files.")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes validating statements in parallel (default: 1).",
+    )
+    parser.add_argument(
+        "--schema",
+        default=SCHEMA_PATH,
+        help="Schema to validate against (default: akomantoso30.xsd next to the converter).",
+    )
+    parser.add_argument(
+        "--json",
+        type=Path,
+        default=None,
+        help="Also write the report ({file: {document: [errors]}}) as JSON to this file.",
+    )
+    args = parser.parse_args()
+
+    xml_files = [str(path) for path in collect_xml_files(args.inputs)]
+    if not xml_files:
+        raise SystemExit("No XML files found.")
+
+    report = validate_files(xml_files, workers=args.jobs, schema_path=args.schema)
+    errors = print_validation_report(report)
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Written: {args.json}")
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,918 +1,3179 @@
-"""
-ITU Final Acts PDF to AKN4UN (Akoma Ntoso for UN) Converter
-
-Converts ITU Plenipotentiary Conference Final Acts PDF into AKN4UN XML markup.
-Handles Decisions, Resolutions, and Recommendations following the AKN4UN specification
-(https://unsceb-hlcm.github.io/).
-
-Usage:
-    python itu_final_acts_to_akn.py <input_pdf> [--output-dir <dir>]
-"""
-
-import re
-import os
-import sys
-import argparse
-from datetime import date
-from dataclasses import dataclass, field
-from typing import Optional
-from lxml import etree
-import fitz  # PyMuPDF
-
-
-# ---------------------------------------------------------------------------
-# Constants
-# ---------------------------------------------------------------------------
-
-AKN_NS = "http://docs.oasis-open.org/legaldocml/ns/akn/3.0"
-XML_NS = "http://www.w3.org/XML/1998/namespace"
-NSMAP = {None: AKN_NS}
-
-
-def _sanitize_xml_text(text: str) -> str:
-    """Remove characters that are not valid in XML 1.0."""
-    if text is None:
-        return ""
-    return re.sub(
-        r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]",
-        "",
-        text,
-    )
-
-PREAMBLE_KEYWORDS = [
-    "considering further",
-    "considering",
-    "noting with satisfaction",
-    "noting with concern",
-    "noting further",
-    "noting",
-    "recalling further",
-    "recalling",
-    "recognizing further",
-    "recognizing",
-    "bearing in mind",
-    "having examined",
-    "having considered",
-    "having regard",
-    "having reviewed",
-    "taking into account",
-    "taking note",
-    "aware",
-    "conscious",
-    "convinced",
-    "concerned",
-    "deeply concerned",
-    "emphasizing",
-    "affirming",
-    "reaffirming",
-    "acknowledging",
-    "appreciating",
-    "welcoming",
-    "mindful",
-    "determined",
-    "expressing",
-    "stressing",
-    "underlining",
-    "observing",
-    "encouraged",
-]
-
-OPERATIVE_KEYWORDS = [
-    "resolves further",
-    "resolves",
-    "decides further",
-    "decides",
-    "instructs the Secretary-General",
-    "instructs the Director",
-    "instructs the ITU Council",
-    "instructs the Council",
-    "instructs the General Secretariat",
-    "instructs",
-    "further instructs the Secretary-General",
-    "further instructs the Director",
-    "further instructs the ITU Council",
-    "further instructs the Council",
-    "further instructs",
-    "invites Member States",
-    "invites Sector Members",
-    "invites the Secretary-General",
-    "invites the Director",
-    "invites the ITU Council",
-    "invites the Council",
-    "invites",
-    "requests the Secretary-General",
-    "requests the Director",
-    "requests the Council",
-    "requests",
-    "urges Member States",
-    "urges",
-    "encourages Member States",
-    "encourages",
-    "calls upon",
-    "recommends",
-    "authorizes the Secretary-General",
-    "authorizes",
-    "charges the Council",
-    "charges",
-    "appeals to",
-]
-
-# Sort keywords longest-first so greedy match picks the most specific form
-PREAMBLE_KEYWORDS.sort(key=len, reverse=True)
-OPERATIVE_KEYWORDS.sort(key=len, reverse=True)
-
-
-# ---------------------------------------------------------------------------
-# Data classes for parsed structure
-# ---------------------------------------------------------------------------
-
-@dataclass
-class SubParagraph:
-    label: str          # e.g. "a)", "1.1", "(i)"
-    text: str = ""
-
-
-@dataclass
-class NumberedParagraph:
-    num: str            # e.g. "1", "2"
-    text: str = ""
-    sub_paragraphs: list = field(default_factory=list)
-
-
-@dataclass
-class PreambleSection:
-    keyword: str        # e.g. "considering", "noting"
-    paragraphs: list = field(default_factory=list)  # list of SubParagraph or plain str
-
-
-@dataclass
-class OperativeSection:
-    keyword: str        # e.g. "resolves", "decides"
-    paragraphs: list = field(default_factory=list)  # list of NumberedParagraph
-
-
-@dataclass
-class DocumentItem:
-    doc_type: str       # "RESOLUTION", "DECISION", "RECOMMENDATION"
-    number: str         # e.g. "2", "5"
-    revision: str       # e.g. "REV. DUBAI, 2018" or "DUBAI, 2018"
-    title: str          # descriptive title
-    enacting_formula: str = ""
-    preamble_sections: list = field(default_factory=list)
-    operative_sections: list = field(default_factory=list)
-    annexes: list = field(default_factory=list)  # list of str (annex text blocks)
-    footnotes: list = field(default_factory=list)
-
-
-@dataclass
-class FinalActs:
-    conference: str = "Plenipotentiary Conference"
-    location: str = "Dubai"
-    year: str = "2018"
-    conference_date: str = "2018-11-15"
-    parts: dict = field(default_factory=dict)  # part_name -> list of DocumentItem
-    signatories_text: str = ""
-    declarations_text: str = ""
-
-
-# ---------------------------------------------------------------------------
-# PDF Extraction
-# ---------------------------------------------------------------------------
-
-class PDFExtractor:
-    """Extracts structured text from the ITU Final Acts PDF."""
-
-    def __init__(self, pdf_path: str):
-        self.doc = fitz.open(pdf_path)
-        self.toc = self.doc.get_toc()
-
-    def close(self):
-        self.doc.close()
-
-    def get_page_text(self, page_num: int) -> str:
-        return self.doc[page_num].get_text("text")
-
-    def get_page_spans(self, page_num: int) -> list:
-        """Get font-aware spans for a page."""
-        spans = []
-        page = self.doc[page_num]
-        blocks = page.get_text("dict")["blocks"]
-        for block in blocks:
-            if "lines" in block:
-                for line in block["lines"]:
-                    for span in line["spans"]:
-                        spans.append({
-                            "text": span["text"],
-                            "font": span["font"],
-                            "size": span["size"],
-                            "flags": span["flags"],
-                            "bbox": span["bbox"],
-                        })
-        return spans
-
-    def extract_text_range(self, start_page: int, end_page: int) -> str:
-        """Extract plain text for a range of pages (0-indexed, inclusive)."""
-        parts = []
-        for pg in range(start_page, min(end_page + 1, len(self.doc))):
-            text = self.get_page_text(pg)
-            text = self._clean_page_text(text, pg)
-            parts.append(text)
-        return "\n".join(parts)
-
-    def _clean_page_text(self, text: str, page_num: int) -> str:
-        """Remove page headers/footers from extracted text.
-
-        The header block at the top of each page typically looks like:
-            (blank) / "Res. 2" / "21" (page number)   -- or reversed order
-        We identify the doc-reference line and the page-number line that is
-        immediately adjacent to it (within 1 line). Lines separated from
-        the doc-ref by a blank line are content (e.g. paragraph numbers)
-        and must NOT be removed.
-        """
-        lines = text.split("\n")
-        skip_indices = set()
-
-        # Find the doc-reference line in the first 5 lines
-        doc_ref_idx = None
-        for i in range(min(5, len(lines))):
-            if re.match(r"^\s*(Res|Dec|Rec)\.\s*\d+", lines[i]):
-                doc_ref_idx = i
-                skip_indices.add(i)
-                break
-
-        if doc_ref_idx is not None:
-            # Remove blank lines before the doc-ref
-            for j in range(doc_ref_idx):
-                if lines[j].strip() == "":
-                    skip_indices.add(j)
-
-            # The page number is usually the line immediately before or after
-            # the doc-ref (not separated by a blank line)
-            for adj in [doc_ref_idx - 1, doc_ref_idx + 1]:
-                if 0 <= adj < len(lines):
-                    if re.match(r"^\s*\d{1,3}\s*$", lines[adj]):
-                        skip_indices.add(adj)
-                    elif lines[adj].strip() == "":
-                        skip_indices.add(adj)
-
-        cleaned = [line for i, line in enumerate(lines) if i not in skip_indices]
-        return "\n".join(cleaned)
-
-
-# ---------------------------------------------------------------------------
-# Document Parser
-# ---------------------------------------------------------------------------
-
-class FinalActsParser:
-    """Parses extracted text into structured DocumentItem objects."""
-
-    DOC_HEADER_RE = re.compile(
-        r"^(RESOLUTION|DECISION|RECOMMENDATION)\s+"
-        r"(\d+(?:\s*\([^)]+\))?)\s*"
-        r"(?:\(([^)]+)\))?\s*$",
-        re.MULTILINE,
-    )
-
-    DOC_HEADER_WITH_TITLE_RE = re.compile(
-        r"(RESOLUTION|DECISION|RECOMMENDATION)\s+"
-        r"(\d+)\s*"
-        r"\(([^)]+)\)\s*"
-        r"(?:\-\s*)?"
-    )
-
-    def __init__(self, extractor: PDFExtractor):
-        self.extractor = extractor
-        self.toc = extractor.toc
-
-    def parse(self) -> FinalActs:
-        acts = FinalActs()
-        doc_entries = self._find_document_entries()
-
-        for i, entry in enumerate(doc_entries):
-            end_page = (doc_entries[i + 1]["page"] - 1
-                        if i + 1 < len(doc_entries)
-                        else len(self.extractor.doc) - 1)
-
-            text = self.extractor.extract_text_range(entry["page"], end_page)
-            doc_item = self._parse_document_text(text, entry)
-
-            if doc_item:
-                part = entry.get("part", "other")
-                if part not in acts.parts:
-                    acts.parts[part] = []
-                acts.parts[part].append(doc_item)
-
-        return acts
-
-    def _find_document_entries(self) -> list:
-        """Use the PDF TOC to find each document entry."""
-        entries = []
-        current_part = "other"
-
-        for level, title, page in self.toc:
-            page_idx = page - 1
-
-            part_match = re.match(r"PART\s+([IVXLC]+)\s*[–—-]\s*(.*)", title.strip())
-            if part_match:
-                current_part = part_match.group(2).strip()
-                continue
-
-            doc_match = re.match(
-                r"(RESOLUTION|DECISION|RECOMMENDATION)\s+(\d+)\s*\(([^)]+)\)\s*(?:-\s*)?(.*)",
-                title.strip(),
-            )
-            if doc_match:
-                entries.append({
-                    "type": doc_match.group(1),
-                    "number": doc_match.group(2),
-                    "revision": doc_match.group(3).strip(),
-                    "title": doc_match.group(4).strip(),
-                    "page": page_idx,
-                    "part": current_part,
-                })
-
-        return entries
-
-    def _parse_document_text(self, raw_text: str, entry: dict) -> Optional[DocumentItem]:
-        """Parse the full text of a single document (resolution/decision/recommendation)."""
-        doc = DocumentItem(
-            doc_type=entry["type"],
-            number=entry["number"],
-            revision=entry["revision"],
-            title=entry["title"],
-        )
-
-        text = self._normalize_text(raw_text)
-
-        # Extract the enacting formula
-        enact_match = re.search(
-            r"(The Plenipotentiary Conference.*?(?:Dubai,\s*2018\)),?)",
-            text, re.DOTALL,
-        )
-        if enact_match:
-            doc.enacting_formula = self._clean_whitespace(enact_match.group(1))
-            text_after_enact = text[enact_match.end():]
-        else:
-            text_after_enact = text
-
-        # Split into preamble and operative sections
-        self._parse_sections(text_after_enact, doc)
-        return doc
-
-    def _normalize_text(self, text: str) -> str:
-        """Normalize whitespace and fix common PDF extraction artifacts."""
-        text = re.sub(r"\u2013|\u2014", "-", text)
-        text = re.sub(r"\u201c|\u201d", '"', text)
-        text = re.sub(r"\u2018|\u2019", "'", text)
-        text = re.sub(r"[ \t]+", " ", text)
-        text = re.sub(r"\n{3,}", "\n\n", text)
-        text = _sanitize_xml_text(text)
-        return text.strip()
-
-    def _clean_whitespace(self, text: str) -> str:
-        return re.sub(r"\s+", " ", text).strip()
-
-    def _parse_sections(self, text: str, doc: DocumentItem):
-        """Split text into preamble and operative sections based on keywords."""
-        all_keywords = (
-            [(kw, "preamble") for kw in PREAMBLE_KEYWORDS]
-            + [(kw, "operative") for kw in OPERATIVE_KEYWORDS]
-        )
-
-        # Find positions of all keyword occurrences
-        section_positions = []
-        for kw, kw_type in all_keywords:
-            pattern = re.compile(r"(?:^|\n)\s*" + re.escape(kw) + r"\s*\n", re.IGNORECASE)
-            for m in pattern.finditer(text):
-                section_positions.append((m.start(), kw, kw_type))
-
-        section_positions.sort(key=lambda x: x[0])
-
-        # Remove overlapping matches (keep longer/earlier)
-        filtered = []
-        for pos, kw, kw_type in section_positions:
-            if not filtered or pos > filtered[-1][0] + len(filtered[-1][1]) + 5:
-                filtered.append((pos, kw, kw_type))
-        section_positions = filtered
-
-        # Extract text for each section
-        for i, (pos, kw, kw_type) in enumerate(section_positions):
-            start = pos
-            end = section_positions[i + 1][0] if i + 1 < len(section_positions) else len(text)
-            section_text = text[start:end].strip()
-
-            # Remove the keyword line itself
-            section_text = re.sub(
-                r"^\s*" + re.escape(kw) + r"\s*",
-                "",
-                section_text,
-                count=1,
-                flags=re.IGNORECASE,
-            ).strip()
-
-            if kw_type == "preamble":
-                preamble_sec = self._parse_preamble_section(kw, section_text)
-                doc.preamble_sections.append(preamble_sec)
-            else:
-                operative_sec = self._parse_operative_section(kw, section_text)
-                doc.operative_sections.append(operative_sec)
-
-    def _parse_preamble_section(self, keyword: str, text: str) -> PreambleSection:
-        """Parse a preamble section into lettered paragraphs."""
-        section = PreambleSection(keyword=keyword)
-
-        # Try to split by letter labels: a), b), c) ...
-        parts = re.split(r"\n\s*([a-z]\))\s*", text)
-
-        if len(parts) > 1:
-            # First part may be intro text before a)
-            if parts[0].strip():
-                section.paragraphs.append(
-                    SubParagraph(label="", text=self._clean_whitespace(parts[0]))
-                )
-            for j in range(1, len(parts), 2):
-                label = parts[j]
-                body = parts[j + 1] if j + 1 < len(parts) else ""
-                section.paragraphs.append(
-                    SubParagraph(label=label, text=self._clean_whitespace(body))
-                )
-        else:
-            section.paragraphs.append(
-                SubParagraph(label="", text=self._clean_whitespace(text))
-            )
-
-        return section
-
-    def _parse_operative_section(self, keyword: str, text: str) -> OperativeSection:
-        """Parse an operative section into numbered paragraphs."""
-        section = OperativeSection(keyword=keyword)
-
-        # Numbers appear on their own line in the PDF extraction.
-        # Match: newline, optional whitespace, one or more digits (possibly with
-        # a decimal sub-number like 1.1), followed by whitespace/newline.
-        # The number must NOT look like a year (4 digits >= 1900).
-        parts = re.split(r"\n\s*(\d{1,2}(?:\.\d+)?)\s*\n", text)
-
-        if len(parts) > 1:
-            if parts[0].strip():
-                section.paragraphs.append(
-                    NumberedParagraph(num="", text=self._clean_whitespace(parts[0]))
-                )
-            for j in range(1, len(parts), 2):
-                num = parts[j]
-                body = parts[j + 1] if j + 1 < len(parts) else ""
-                para = NumberedParagraph(
-                    num=num,
-                    text=self._clean_whitespace(body),
-                )
-                self._parse_sub_paragraphs(body, para)
-                section.paragraphs.append(para)
-        else:
-            # Fallback: try "10 that..." pattern (number at start of line
-            # followed directly by text, as seen for paragraph 10+)
-            parts2 = re.split(r"\n\s*(\d{1,2})\s+(?=that |to )", text)
-            if len(parts2) > 2:
-                if parts2[0].strip():
-                    section.paragraphs.append(
-                        NumberedParagraph(num="", text=self._clean_whitespace(parts2[0]))
-                    )
-                for j in range(1, len(parts2), 2):
-                    num = parts2[j]
-                    body = parts2[j + 1] if j + 1 < len(parts2) else ""
-                    para = NumberedParagraph(
-                        num=num,
-                        text=self._clean_whitespace(body),
-                    )
-                    self._parse_sub_paragraphs(body, para)
-                    section.paragraphs.append(para)
-            else:
-                section.paragraphs.append(
-                    NumberedParagraph(num="", text=self._clean_whitespace(text))
-                )
-
-        return section
-
-    def _parse_sub_paragraphs(self, text: str, para: NumberedParagraph):
-        """Extract sub-numbered items like 1.1, 1.2, or a), b) within a paragraph."""
-        # Sub-numbers like 1.1, 1.2
-        sub_parts = re.split(r"\n\s*(\d+\.\d+)\s+", text)
-        if len(sub_parts) > 2:
-            para.text = self._clean_whitespace(sub_parts[0])
-            for j in range(1, len(sub_parts), 2):
-                label = sub_parts[j]
-                body = sub_parts[j + 1] if j + 1 < len(sub_parts) else ""
-                para.sub_paragraphs.append(
-                    SubParagraph(label=label, text=self._clean_whitespace(body))
-                )
-            return
-
-        # Letter sub-paragraphs: a), b)
-        sub_parts = re.split(r"\n\s*([a-z]\))\s*", text)
-        if len(sub_parts) > 2:
-            para.text = self._clean_whitespace(sub_parts[0])
-            for j in range(1, len(sub_parts), 2):
-                label = sub_parts[j]
-                body = sub_parts[j + 1] if j + 1 < len(sub_parts) else ""
-                para.sub_paragraphs.append(
-                    SubParagraph(label=label, text=self._clean_whitespace(body))
-                )
-
-
-# ---------------------------------------------------------------------------
-# AKN4UN XML Generator
-# ---------------------------------------------------------------------------
-
-class AKNGenerator:
-    """Generates AKN4UN XML from parsed document structures."""
-
-    def __init__(self, final_acts: FinalActs):
-        self.acts = final_acts
-        self.today = date.today().isoformat()
-
-    def _el(self, tag: str, parent=None, text=None, **attribs) -> etree._Element:
-        """Create an AKN element."""
-        el = etree.SubElement(parent, f"{{{AKN_NS}}}{tag}") if parent is not None else etree.Element(f"{{{AKN_NS}}}{tag}", nsmap=NSMAP)
-        for k, v in attribs.items():
-            if k == "xml_lang":
-                el.set(f"{{{XML_NS}}}lang", v)
-            elif k == "eId":
-                el.set("eId", v)
-            elif k == "wId":
-                el.set("wId", v)
-            else:
-                el.set(k.replace("_", ""), v)
-        if text:
-            el.text = _sanitize_xml_text(text)
-        return el
-
-    def generate_collection(self) -> etree._Element:
-        """Generate the top-level documentCollection for the entire Final Acts."""
-        root = self._el("akomaNtoso")
-        doc_collection = self._el("documentCollection", root, name="finalActs")
-        doc_collection.set(f"{{{XML_NS}}}lang", "en")
-
-        self._add_collection_meta(doc_collection)
-        self._add_collection_preface(doc_collection)
-
-        coll_body = self._el("collectionBody", doc_collection)
-
-        for part_name, documents in self.acts.parts.items():
-            part_eid = self._make_eid(part_name)
-            part_el = self._el("component", coll_body, eId=f"cmp_{part_eid}")
-            self._el("componentRef",
-                      part_el,
-                      src=f"#cmp_{part_eid}",
-                      showAs=part_name)
-
-        self._add_components_section(doc_collection)
-
-        return root
-
-    def _add_collection_meta(self, parent):
-        """Add metadata block for the collection."""
-        meta = self._el("meta", parent)
-        ident = self._el("identification", meta, source="#itu")
-
-        work_iri_base = "/akn/un/officialGazette/publication/itu-pp/2018-11-15/pp-18-final-acts"
-
-        work = self._el("FRBRWork", ident)
-        self._el("FRBRthis", work, value=f"{work_iri_base}/!main")
-        self._el("FRBRuri", work, value=work_iri_base)
-        self._el("FRBRdate", work, date="2018-11-15", name="publication")
-        self._el("FRBRauthor", work, href="#itu-pp")
-        self._el("FRBRcountry", work, value="un")
-        self._el("FRBRsubtype", work, value="publication")
-        self._el("FRBRnumber", work, value="pp-18-final-acts", showAs="Final Acts PP-18")
-
-        expr = self._el("FRBRExpression", ident)
-        self._el("FRBRthis", expr, value=f"{work_iri_base}/eng@2018-11-15/!main")
-        self._el("FRBRuri", expr, value=f"{work_iri_base}/eng@2018-11-15")
-        self._el("FRBRdate", expr, date="2018-11-15", name="publication")
-        self._el("FRBRauthor", expr, href="#itu-pp")
-        self._el("FRBRlanguage", expr, language="eng")
-
-        manif = self._el("FRBRManifestation", ident)
-        self._el("FRBRthis", manif, value=f"{work_iri_base}/eng@2018-11-15/.xml")
-        self._el("FRBRuri", manif, value=f"{work_iri_base}/eng@2018-11-15/.xml")
-        self._el("FRBRdate", manif, date=self.today, name="XMLMarkup")
-        self._el("FRBRauthor", manif, href="#converter")
-
-        refs = self._el("references", meta, source="#converter")
-        self._el("TLCOrganization",
-                 refs,
-                 eId="itu",
-                 href="/ontology/organizations/itu",
-                 showAs="International Telecommunication Union")
-        self._el("TLCOrganization",
-                 refs,
-                 eId="itu-pp",
-                 href="/ontology/organizations/itu-pp",
-                 showAs="ITU Plenipotentiary Conference (Dubai, 2018)")
-        self._el("TLCOrganization",
-                 refs,
-                 eId="converter",
-                 href="/ontology/software/akn4itu-converter",
-                 showAs="AKN4ITU PDF Converter")
-
-    def _add_collection_preface(self, parent):
-        """Add preface block for the collection."""
-        preface = self._el("preface", parent)
-        long_title = self._el("longTitle", preface)
-        p = self._el("p", long_title)
-        doc_type = self._el("docType", p, text="FINAL ACTS")
-        p_text = self._el("docTitle", p,
-                          text=f"of the {self.acts.conference} ({self.acts.location}, {self.acts.year})")
-
-    def _add_components_section(self, doc_collection):
-        """Add the <components> section with each individual document."""
-        components = self._el("components", doc_collection)
-
-        for part_name, documents in self.acts.parts.items():
-            for doc_item in documents:
-                comp_eid = self._doc_eid(doc_item)
-                comp_el = self._el("component", components, eId=f"cmp_{comp_eid}")
-                doc_xml = self._generate_single_document(doc_item)
-                comp_el.append(doc_xml)
-
-    def _generate_single_document(self, doc_item: DocumentItem) -> etree._Element:
-        """Generate AKN4UN XML for a single Resolution/Decision/Recommendation."""
-        doc_type_akn = "statement"
-        subtype = "deliberation"
-        name = doc_item.doc_type.lower()
-
-        statement = self._el(doc_type_akn, name=name)
-        statement.set(f"{{{XML_NS}}}lang", "en")
-
-        self._add_document_meta(statement, doc_item)
-        self._add_document_preface(statement, doc_item)
-
-        if doc_item.preamble_sections:
-            self._add_document_preamble(statement, doc_item)
-
-        self._add_document_body(statement, doc_item)
-
-        if doc_item.annexes:
-            self._add_document_attachments(statement, doc_item)
-
-        return statement
-
-    def _add_document_meta(self, parent, doc_item: DocumentItem):
-        """Add FRBR metadata for a single document."""
-        meta = self._el("meta", parent)
-        ident = self._el("identification", meta, source="#itu")
-
-        num_slug = doc_item.number.replace("/", "-").replace(" ", "_")
-        doc_prefix = doc_item.doc_type.lower()[:3]
-        work_iri = f"/akn/un/statement/deliberation/itu-pp/2018-11-15/{doc_prefix}-{num_slug}"
-
-        work = self._el("FRBRWork", ident)
-        self._el("FRBRthis", work, value=f"{work_iri}/!main")
-        self._el("FRBRuri", work, value=work_iri)
-        self._el("FRBRdate", work, date="2018-11-15", name="adoption")
-        self._el("FRBRauthor", work, href="#itu-pp")
-        self._el("FRBRcountry", work, value="un")
-        self._el("FRBRsubtype", work, value="deliberation")
-        num_el = self._el("FRBRnumber", work, value=f"{doc_prefix}-{num_slug}")
-        num_el.set("showAs", f"{doc_item.doc_type} {doc_item.number} ({doc_item.revision})")
-
-        expr = self._el("FRBRExpression", ident)
-        self._el("FRBRthis", expr, value=f"{work_iri}/eng@2018-11-15/!main")
-        self._el("FRBRuri", expr, value=f"{work_iri}/eng@2018-11-15")
-        self._el("FRBRdate", expr, date="2018-11-15", name="adoption")
-        self._el("FRBRauthor", expr, href="#itu-pp")
-        self._el("FRBRlanguage", expr, language="eng")
-
-        manif = self._el("FRBRManifestation", ident)
-        self._el("FRBRthis", manif, value=f"{work_iri}/eng@2018-11-15/.xml")
-        self._el("FRBRuri", manif, value=f"{work_iri}/eng@2018-11-15/.xml")
-        self._el("FRBRdate", manif, date=self.today, name="XMLMarkup")
-        self._el("FRBRauthor", manif, href="#converter")
-
-        refs = self._el("references", meta, source="#converter")
-        self._el("TLCOrganization",
-                 refs,
-                 eId="itu",
-                 href="/ontology/organizations/itu",
-                 showAs="International Telecommunication Union")
-        self._el("TLCOrganization",
-                 refs,
-                 eId="itu-pp",
-                 href="/ontology/organizations/itu-pp",
-                 showAs="ITU Plenipotentiary Conference")
-
-    def _add_document_preface(self, parent, doc_item: DocumentItem):
-        """Add the identification/title block."""
-        preface = self._el("preface", parent)
-        long_title = self._el("longTitle", preface, eId="longTitle_1")
-        p = self._el("p", long_title)
-
-        self._el("docType", p, text=doc_item.doc_type)
-        self._el("docNumber", p, text=f"{doc_item.number} ({doc_item.revision})")
-
-        title_block = self._el("container", preface, name="title", eId="container_title")
-        self._el("p", title_block, text=doc_item.title)
-
-    def _add_document_preamble(self, parent, doc_item: DocumentItem):
-        """Add the preamble with recitals/considering clauses."""
-        preamble = self._el("preamble", parent, eId="preamble")
-
-        if doc_item.enacting_formula:
-            formula = self._el("formula", preamble, name="enactingFormula", eId="formula_1")
-            self._el("p", formula, text=doc_item.enacting_formula)
-
-        recital_counter = 0
-        for sec in doc_item.preamble_sections:
-            recitals = self._el("recitals", preamble, eId=f"recs_{self._make_eid(sec.keyword)}")
-
-            intro = self._el("intro", recitals)
-            p_intro = self._el("p", intro)
-            i_el = etree.SubElement(p_intro, f"{{{AKN_NS}}}i")
-            i_el.text = sec.keyword
-
-            for para in sec.paragraphs:
-                recital_counter += 1
-                rec_eid = f"rec_{recital_counter}"
-
-                if para.label:
-                    recital = self._el("recital", recitals, eId=rec_eid)
-                    self._el("num", recital, text=para.label)
-                    self._el("p", recital, text=para.text)
-                else:
-                    recital = self._el("recital", recitals, eId=rec_eid)
-                    self._el("p", recital, text=para.text)
-
-    def _add_document_body(self, parent, doc_item: DocumentItem):
-        """Add the main body with operative sections."""
-        main_body = self._el("mainBody", parent, eId="body")
-
-        para_counter = 0
-
-        for sec in doc_item.operative_sections:
-            sec_eid = self._make_eid(sec.keyword)
-            section = self._el("hcontainer", main_body, name=sec_eid, eId=f"hcont_{sec_eid}")
-
-            heading = self._el("heading", section)
-            i_el = etree.SubElement(heading, f"{{{AKN_NS}}}i")
-            i_el.text = sec.keyword
-
-            for para in sec.paragraphs:
-                para_counter += 1
-
-                if para.num:
-                    para_el = self._el("paragraph", section, eId=f"para_{para.num}")
-                    self._el("num", para_el, text=para.num)
-
-                    if para.sub_paragraphs:
-                        content = self._el("content", para_el)
-                        if para.text:
-                            self._el("p", content, text=para.text)
-                        lst = self._el("list", para_el, eId=f"para_{para.num}__list_1")
-
-                        for sp in para.sub_paragraphs:
-                            point_eid = f"para_{para.num}__point_{sp.label.replace(')', '').replace('.', '-')}"
-                            point = self._el("point", lst, eId=point_eid)
-                            self._el("num", point, text=sp.label)
-                            content_sp = self._el("content", point)
-                            self._el("p", content_sp, text=sp.text)
-                    else:
-                        content = self._el("content", para_el)
-                        self._el("p", content, text=para.text)
-                else:
-                    block = self._el("paragraph", section, eId=f"para_unnumbered_{para_counter}")
-                    content = self._el("content", block)
-                    self._el("p", content, text=para.text)
-
-    def _add_document_attachments(self, parent, doc_item: DocumentItem):
-        """Add annexes/attachments if present."""
-        attachments = self._el("attachments", parent)
-        for i, annex_text in enumerate(doc_item.annexes, 1):
-            att = self._el("attachment", attachments, eId=f"att_{i}")
-            heading = self._el("heading", att, text=f"Annex {i}")
-            doc_el = self._el("doc", att, name="annex")
-            meta = self._el("meta", doc_el)
-            ident = self._el("identification", meta, source="#itu")
-            main_body = self._el("mainBody", doc_el)
-            p = self._el("p", main_body, text=annex_text[:500])
-
-    def _make_eid(self, text: str) -> str:
-        """Convert text to a valid eId."""
-        eid = re.sub(r"[^a-zA-Z0-9]", "_", text.lower())
-        eid = re.sub(r"_+", "_", eid).strip("_")
-        return eid[:50]
-
-    def _doc_eid(self, doc_item: DocumentItem) -> str:
-        """Create eId for a document item."""
-        prefix = doc_item.doc_type.lower()[:3]
-        return f"{prefix}_{doc_item.number}"
-
-
-# ---------------------------------------------------------------------------
-# XML Writer
-# ---------------------------------------------------------------------------
-
-def write_xml(root: etree._Element, output_path: str):
-    """Write the XML tree to file with proper formatting."""
-    tree = etree.ElementTree(root)
-    etree.indent(tree, space="  ")
-    with open(output_path, "wb") as f:
-        tree.write(
-            f,
-            xml_declaration=True,
-            encoding="UTF-8",
-            pretty_print=True,
-        )
-    print(f"Written: {output_path}")
-
-
-def write_individual_documents(final_acts: FinalActs, output_dir: str):
-    """Write each document as a separate AKN4UN XML file."""
-    generator = AKNGenerator(final_acts)
-
-    for part_name, documents in final_acts.parts.items():
-        for doc_item in documents:
-            prefix = doc_item.doc_type.lower()[:3]
-            filename = f"{prefix}_{doc_item.number}.xml"
-            filepath = os.path.join(output_dir, filename)
-
-            root = etree.Element(f"{{{AKN_NS}}}akomaNtoso", nsmap=NSMAP)
-            doc_xml = generator._generate_single_document(doc_item)
-            root.append(doc_xml)
-            write_xml(root, filepath)
-
-
-# ---------------------------------------------------------------------------
-# Main
-# ---------------------------------------------------------------------------
-
-def main():
-    parser = argparse.ArgumentParser(
-        description="Convert ITU Final Acts PDF to AKN4UN XML"
-    )
-    parser.add_argument("input_pdf", help="Path to the Final Acts PDF file")
-    parser.add_argument(
-        "--output-dir",
-        default=None,
-        help="Output directory (default: same as input PDF)",
-    )
-    parser.add_argument(
-        "--individual",
-        action="store_true",
-        help="Also write each document as a separate XML file",
-    )
-    args = parser.parse_args()
-
-    if not os.path.exists(args.input_pdf):
-        print(f"Error: File not found: {args.input_pdf}")
-        sys.exit(1)
-
-    output_dir = args.output_dir or os.path.dirname(os.path.abspath(args.input_pdf))
-    os.makedirs(output_dir, exist_ok=True)
-
-    print(f"Reading PDF: {args.input_pdf}")
-    extractor = PDFExtractor(args.input_pdf)
-
-    print("Parsing document structure...")
-    doc_parser = FinalActsParser(extractor)
-    final_acts = doc_parser.parse()
-
-    total_docs = sum(len(docs) for docs in final_acts.parts.values())
-    print(f"Found {total_docs} documents across {len(final_acts.parts)} parts:")
-    for part_name, docs in final_acts.parts.items():
-        print(f"  {part_name}: {len(docs)} documents")
-        for d in docs[:3]:
-            print(f"    - {d.doc_type} {d.number}: {d.title[:60]}")
-        if len(docs) > 3:
-            print(f"    ... and {len(docs) - 3} more")
-
-    # Generate the collection XML
-    print("\nGenerating AKN4UN XML...")
-    generator = AKNGenerator(final_acts)
-    root = generator.generate_collection()
-
-    collection_path = os.path.join(output_dir, "pp18_final_acts_akn.xml")
-    write_xml(root, collection_path)
-
-    # Optionally write individual files
-    if args.individual:
-        individual_dir = os.path.join(output_dir, "individual")
-        os.makedirs(individual_dir, exist_ok=True)
-        print(f"\nWriting individual documents to: {individual_dir}")
-        write_individual_documents(final_acts, individual_dir)
-
-    extractor.close()
-
-    print("\nConversion complete!")
-    print(f"Collection file: {collection_path}")
-
-    # Print a sample of the generated XML
-    xml_str = etree.tostring(root, pretty_print=True, encoding="unicode")
-    lines = xml_str.split("\n")
-    print(f"\nXML preview (first 50 lines of {len(lines)} total):")
-    for line in lines[:50]:
-        print(line)
-    if len(lines) > 50:
-        print(f"... ({len(lines) - 50} more lines)")
-
-
-if __name__ == "__main__":
-    main()
+"""
+ITU Final Acts PDF to AKN4UN (Akoma Ntoso for UN) Converter
+
+Converts ITU Plenipotentiary Conference Final Acts PDF into AKN4UN XML markup.
+Handles Decisions, Resolutions, and Recommendations following the AKN4UN specification
+(https://unsceb-hlcm.github.io/).
+
+Usage:
+    python itu_final_acts_to_akn.py <input_pdf> [--output-dir <dir>] [--workers N]
+                                    [--page-cache <file>] [--layout] [--pipeline]
+                                    [--incremental] [--dump-ir <file>] [--validate] [--validation-json <file>]
+                                    [--profile] [--metrics-json <file>]
+    python itu_final_acts_to_akn.py --from-ir <file> [--output-dir <dir>] [--individual]
+    python itu_final_acts_to_akn.py --batch <manifest.json> [--output-dir <dir>]
+                                    [--workers N] [--individual] [--layout]
+"""
+
+import re
+import os
+import sys
+import zlib
+import sqlite3
+import json
+import time
+import hashlib
+import argparse
+import queue
+import threading
+from contextlib import contextmanager, nullcontext
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+from lxml import etree
+import numpy as np
+import fitz  # PyMuPDF
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+AKN_NS = "http://docs.oasis-open.org/legaldocml/ns/akn/3.0"
+XML_NS = "http://www.w3.org/XML/1998/namespace"
+NSMAP = {None: AKN_NS}
+
+
+def _sanitize_xml_text(text: str) -> str:
+    """Remove characters that are not valid in XML 1.0."""
+    if text is None:
+        return ""
+    return XML_INVALID_CHARS_RE.sub("", text)
+
+
+PREAMBLE_KEYWORDS = [
+    "considering further",
+    "considering",
+    "noting with satisfaction",
+    "noting with concern",
+    "noting further",
+    "noting",
+    "recalling further",
+    "recalling",
+    "recognizing further",
+    "recognizing",
+    "bearing in mind",
+    "having examined",
+    "having considered",
+    "having regard",
+    "having reviewed",
+    "taking into account",
+    "taking note",
+    "aware",
+    "conscious",
+    "convinced",
+    "concerned",
+    "deeply concerned",
+    "emphasizing",
+    "affirming",
+    "reaffirming",
+    "acknowledging",
+    "appreciating",
+    "welcoming",
+    "mindful",
+    "determined",
+    "expressing",
+    "stressing",
+    "underlining",
+    "observing",
+    "encouraged",
+]
+
+OPERATIVE_KEYWORDS = [
+    "resolves further",
+    "resolves",
+    "decides further",
+    "decides",
+    "instructs the Secretary-General",
+    "instructs the Director",
+    "instructs the ITU Council",
+    "instructs the Council",
+    "instructs the General Secretariat",
+    "instructs",
+    "further instructs the Secretary-General",
+    "further instructs the Director",
+    "further instructs the ITU Council",
+    "further instructs the Council",
+    "further instructs",
+    "invites Member States",
+    "invites Sector Members",
+    "invites the Secretary-General",
+    "invites the Director",
+    "invites the ITU Council",
+    "invites the Council",
+    "invites",
+    "requests the Secretary-General",
+    "requests the Director",
+    "requests the Council",
+    "requests",
+    "urges Member States",
+    "urges",
+    "encourages Member States",
+    "encourages",
+    "calls upon",
+    "recommends",
+    "authorizes the Secretary-General",
+    "authorizes",
+    "charges the Council",
+    "charges",
+    "appeals to",
+]
+
+# Sort keywords longest-first so greedy match picks the most specific form
+PREAMBLE_KEYWORDS.sort(key=len, reverse=True)
+OPERATIVE_KEYWORDS.sort(key=len, reverse=True)
+
+# Canonical keyword and section type, looked up by the lower-cased match
+SECTION_KEYWORD_TYPES = {
+    **{kw.lower(): (kw, "preamble") for kw in PREAMBLE_KEYWORDS},
+    **{kw.lower(): (kw, "operative") for kw in OPERATIVE_KEYWORDS},
+}
+
+# One alternation over every keyword, built once. A keyword must occupy its
+# own line; the trailing newline is a lookahead so that a keyword line directly
+# following another is still found in the same left-to-right scan.
+SECTION_KEYWORD_RE = re.compile(
+    r"(?:^|\n)\s*("
+    + "|".join(re.escape(kw) for kw in sorted(SECTION_KEYWORD_TYPES, key=len, reverse=True))
+    + r")(?=\s*\n)",
+    re.IGNORECASE,
+)
+
+# Blank-line run after a keyword, up to and including its last newline
+KEYWORD_LINE_END_RE = re.compile(r"\s*\n")
+
+# Footnote reference markers found by PageLayout are kept in the body text
+# between these private-use characters until AKNGenerator replaces them
+# with <authorialNote> elements.
+NOTE_REF_START, NOTE_REF_END = "\ue000", "\ue001"
+NOTE_REF_RE = re.compile(f"{NOTE_REF_START}([^{NOTE_REF_END}]*){NOTE_REF_END}")
+
+# Likewise, the place of each table is kept as its index in
+# DocumentItem.tables between these, on a line of its own, until
+# AKNGenerator writes the <table> there.
+TABLE_REF_START, TABLE_REF_END = "\ue002", "\ue003"
+TABLE_REF_RE = re.compile(f"{TABLE_REF_START}(\\d+){TABLE_REF_END}")
+
+# Annex heading on a line of its own: "ANNEX TO RESOLUTION 2 (REV. DUBAI, 2018)",
+# "ANNEX 1 TO DECISION 5 (...)"; upper case, unlike "Annex 2 to this decision"
+ANNEX_HEADING_RE = re.compile(
+    r"^[ \t]*(ANNEX(?: [0-9A-Z]{1,3})? TO (?:RESOLUTION|DECISION|RECOMMENDATION)\b[^\n]*)$",
+    re.MULTILINE,
+)
+
+# Footnote marker at the start of a footnote line: "1", "12", "*"
+NOTE_MARKER_RE = re.compile(r"^\s*(\d{1,3}|\*{1,3})\s*(.*)$", re.DOTALL)
+
+# Cross-references, all kinds in one pattern so paragraph text is scanned
+# once, left to right:
+#   Resolution 77 (Rev. Dubai, 2018) / Decision 5 / Recommendation 7 (Marrakesh, 2002)
+#   No. 58 of the Convention / Article 8 of the Constitution
+REFERENCE_RE = re.compile(
+    r"\b(?:"
+    r"(?P<doc_type>Resolution|Decision|Recommendation)\s+(?P<number>\d+)"
+    r"(?:\s*\((?:Rev\.\s*)?(?P<location>[A-Z][^,()]*?),\s*(?P<year>\d{4})\))?"
+    r"|(?P<provision>Article|No\.)\s*(?P<provision_number>\d+[A-Z]?)\s+of\s+the\s+"
+    r"(?P<instrument>Constitution|Convention)\b"
+    r")"
+)
+
+# Work IRIs of the basic instruments (Geneva, 1992)
+INSTRUMENT_IRIS = {
+    "Constitution": "/akn/un/act/constitution/itu/1992-12-22/main",
+    "Convention": "/akn/un/act/convention/itu/1992-12-22/main",
+}
+PROVISION_EID_PREFIX = {"Article": "art", "No.": "prov"}
+
+# Patterns of the per-page, per-section and per-paragraph hot paths, compiled
+# once here rather than passed as literals to re.sub()/re.split(), which look
+# them up in the re module's bounded cache on every call.
+
+# PDFExtractor._clean_page_text: "Res. 2" header line and page number line
+PAGE_DOC_REF_RE = re.compile(r"^\s*(Res|Dec|Rec)\.\s*\d+")
+PAGE_NUMBER_RE = re.compile(r"^\s*\d{1,3}\s*$")
+
+# FinalActsParser._find_document_entries: TOC titles
+TOC_PART_RE = re.compile(r"PART\s+([IVXLC]+)\s*[–—-]\s*(.*)")
+TOC_DOCUMENT_RE = re.compile(r"(RESOLUTION|DECISION|RECOMMENDATION)\s+(\d+)\s*\(([^)]+)\)\s*(?:-\s*)?(.*)")
+
+# _sanitize_xml_text: characters not allowed in XML 1.0
+XML_INVALID_CHARS_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]")
+
+# FinalActsParser._normalize_text, in a single pass:
+#   - a run of spaces and tabs becomes one space (a lone space is not matched)
+#   - a run of three or more newlines becomes one blank line
+#   - typographic dashes and quotes become ASCII (NORMALIZE_CHARS)
+#   - characters not allowed in XML 1.0 are dropped
+# A dropped character still separates the runs on either side of it, as it
+# did when the runs were collapsed first and the characters dropped after.
+NORMALIZE_RE = re.compile(
+    r" [ \t]+|\t[ \t]*|\n\n\n+"
+    r"|[\u2013\u2014\u201c\u201d\u2018\u2019\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]"
+)
+NORMALIZE_CHARS = {
+    "\u2013": "-", "\u2014": "-",
+    "\u201c": '"', "\u201d": '"',
+    "\u2018": "'", "\u2019": "'",
+}
+
+
+# Whitespace and removed control characters at the end of the raw text.
+# No NORMALIZE_RE match reaches across the character before them, so the
+# text up to there normalises the same on its own as joined with what
+# follows (DocumentTextStream).
+NORMALIZE_PENDING_RE = re.compile(r"[\s\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]*\Z")
+
+
+def _normalize_match(m: "re.Match") -> str:
+    """NORMALIZE_RE replacement for one match."""
+    c = m.group()[0]
+    if c == " " or c == "\t":
+        return " "
+    if c == "\n":
+        return "\n\n"
+    return NORMALIZE_CHARS.get(c, "")
+
+
+# FinalActsParser._clean_whitespace
+WHITESPACE_RE = re.compile(r"\s+")
+
+# Section and paragraph splitting; each captures the label or number
+LETTER_ITEM_SPLIT_RE = re.compile(r"\n\s*([a-z]\))\s*")              # a), b)
+PARAGRAPH_NUMBER_SPLIT_RE = re.compile(r"\n\s*(\d{1,2}(?:\.\d+)?)\s*\n")  # "3" on its own line
+INLINE_PARAGRAPH_NUMBER_SPLIT_RE = re.compile(r"\n\s*(\d{1,2})\s+(?=that |to )")  # "10 that ..."
+DECIMAL_ITEM_SPLIT_RE = re.compile(r"\n\s*(\d+\.\d+)\s+")          # 1.1, 1.2
+
+# _keyword_eid, used by AKNGenerator._make_eid
+EID_INVALID_RE = re.compile(r"[^a-zA-Z0-9]")
+EID_UNDERSCORES_RE = re.compile(r"_+")
+
+
+# ---------------------------------------------------------------------------
+# Data classes for parsed structure
+# ---------------------------------------------------------------------------
+
+# The document classes are created in large numbers for a multi-conference
+# corpus, so they use __slots__ (Python 3.10+) instead of a per-instance
+# __dict__. Keywords, labels and other strings drawn from a small set are
+# interned, so every recital labelled "a)" shares one string object.
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_SLOTS)
+class SubParagraph:
+    label: str          # e.g. "a)", "1.1", "(i)"
+    text: str = ""
+
+    def __post_init__(self):
+        self.label = sys.intern(self.label)
+
+
+@dataclass(**_SLOTS)
+class NumberedParagraph:
+    num: str            # e.g. "1", "2"
+    text: str = ""
+    sub_paragraphs: list = field(default_factory=list)
+
+    def __post_init__(self):
+        self.num = sys.intern(self.num)
+
+
+@dataclass(**_SLOTS)
+class PreambleSection:
+    keyword: str        # e.g. "considering", "noting"
+    paragraphs: list = field(default_factory=list)  # list of SubParagraph or plain str
+
+    def __post_init__(self):
+        self.keyword = sys.intern(self.keyword)
+
+
+@dataclass(**_SLOTS)
+class OperativeSection:
+    keyword: str        # e.g. "resolves", "decides"
+    paragraphs: list = field(default_factory=list)  # list of NumberedParagraph
+
+    def __post_init__(self):
+        self.keyword = sys.intern(self.keyword)
+
+
+@dataclass(**_SLOTS)
+class Footnote:
+    marker: str         # e.g. "1", "*"
+    text: str = ""
+    page: int = 0       # 0-indexed PDF page the note was printed on
+
+    def __post_init__(self):
+        self.marker = sys.intern(self.marker)
+
+
+@dataclass(**_SLOTS)
+class Table:
+    rows: list = field(default_factory=list)  # list of rows, each a list of cell texts
+    page: int = 0       # 0-indexed PDF page the table was printed on
+
+
+@dataclass(**_SLOTS)
+class TextualMod:
+    type: str           # "substitution", "insertion" or "repeal" (deletion)
+    source: str         # collection work IRI of the revising conference
+    destination: str    # href of the affected unit
+    old: str = ""       # href of the unit in the previous version
+    new: str = ""       # href of the unit in this version
+
+    def __post_init__(self):
+        self.type = sys.intern(self.type)
+        self.source = sys.intern(self.source)
+
+
+@dataclass(**_SLOTS)
+class DocumentItem:
+    doc_type: str       # "RESOLUTION", "DECISION", "RECOMMENDATION"
+    number: str         # e.g. "2", "5"
+    revision: str       # e.g. "REV. DUBAI, 2018" or "DUBAI, 2018"
+    title: str          # descriptive title
+    enacting_formula: str = ""
+    preamble_sections: list = field(default_factory=list)
+    operative_sections: list = field(default_factory=list)
+    annexes: list = field(default_factory=list)  # list of str (heading line, then the annex text)
+    footnotes: list = field(default_factory=list)  # list of Footnote
+    tables: list = field(default_factory=list)  # list of Table (layout mode)
+    modifications: list = field(default_factory=list)  # list of TextualMod vs. the previous version
+
+    def __post_init__(self):
+        self.doc_type = sys.intern(self.doc_type)
+        self.revision = sys.intern(self.revision)
+
+
+@dataclass
+class FinalActs:
+    conference: str = "Plenipotentiary Conference"
+    location: str = "Dubai"
+    year: str = "2018"
+    conference_date: str = "2018-11-15"
+    body: str = "itu-pp"          # FRBR author / IRI segment of the adopting body
+    abbreviation: str = "PP-18"
+    parts: dict = field(default_factory=dict)  # part_name -> list of DocumentItem
+    signatories_text: str = ""
+    declarations_text: str = ""
+    fingerprints: dict = field(default_factory=dict)  # doc eId -> source fingerprint
+    unchanged: set = field(default_factory=set)  # doc eIds not re-parsed (incremental mode)
+
+    @property
+    def slug(self) -> str:
+        """e.g. "pp-18", used in the collection IRI and file name."""
+        return self.abbreviation.lower().replace(" ", "-")
+
+    @property
+    def collection_work_iri(self) -> str:
+        return f"/akn/un/officialGazette/publication/{self.body}/{self.conference_date}/{self.slug}-final-acts"
+
+    @property
+    def collection_filename(self) -> str:
+        """e.g. "pp18_final_acts_akn.xml"."""
+        return f"{self.slug.replace('-', '')}_final_acts_akn.xml"
+
+
+# FinalActs fields that describe the conference; keys of a batch manifest entry
+CONFERENCE_FIELDS = ("conference", "location", "year", "conference_date", "body", "abbreviation")
+
+
+# ---------------------------------------------------------------------------
+# Metrics
+# ---------------------------------------------------------------------------
+
+def _reset_peak_rss() -> bool:
+    """Reset the kernel's RSS high-water mark (Linux only)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB, if the platform reports it."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class ConversionMetrics:
+    """Wall time, CPU time, peak memory and match counts per stage and document.
+
+    Stages are entered repeatedly (once per document for extraction, section
+    parsing, generation and serialisation) and their totals accumulate.
+
+    Peak memory is the process-wide high-water mark, reset on entry to each
+    stage. It is only meaningful when one stage runs at a time, so it is not
+    recorded while ``concurrent`` is set (--pipeline), and reported as n/a.
+    """
+
+    STAGES = ("extraction", "toc_parsing", "section_parsing",
+              "ir", "xml_generation", "serialisation", "validation")
+
+    def __init__(self):
+        self.stages = {}     # stage -> {"wall_s", "cpu_s", "peak_rss_mb", "calls"}
+        self.documents = {}  # doc eId -> per-document record
+        self.concurrent = False  # stages overlap in threads; peak memory is not recorded
+
+    def document(self, doc_eid: str) -> dict:
+        """Return the per-document record, creating it on first use."""
+        return self.documents.setdefault(doc_eid, {"doc": doc_eid})
+
+    @contextmanager
+    def stage(self, name: str, doc_eid: Optional[str] = None):
+        """Time a stage, adding its wall time to ``doc_eid``'s record if given."""
+        concurrent = self.concurrent
+        if not concurrent:
+            _reset_peak_rss()
+        # CPU time of the calling thread: stages run concurrently in --pipeline mode
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = time.thread_time() - cpu
+            totals = self.stages.setdefault(
+                name, {"wall_s": 0.0, "cpu_s": 0.0, "peak_rss_mb": None, "calls": 0}
+            )
+            totals["wall_s"] += wall
+            totals["cpu_s"] += cpu
+            totals["calls"] += 1
+            peak = None if concurrent else _peak_rss_mb()
+            if peak is not None:
+                totals["peak_rss_mb"] = max(totals["peak_rss_mb"] or 0.0, peak)
+            if doc_eid is not None:
+                record = self.document(doc_eid)
+                record[f"{name}_s"] = record.get(f"{name}_s", 0.0) + wall
+
+    def merge(self, other: dict):
+        """Fold in the ``to_dict()`` output of another (worker process) instance."""
+        for name, theirs in other["stages"].items():
+            ours = self.stages.setdefault(
+                name, {"wall_s": 0.0, "cpu_s": 0.0, "peak_rss_mb": None, "calls": 0}
+            )
+            ours["wall_s"] += theirs["wall_s"]
+            ours["cpu_s"] += theirs["cpu_s"]
+            ours["calls"] += theirs["calls"]
+            if theirs["peak_rss_mb"] is not None:
+                ours["peak_rss_mb"] = max(ours["peak_rss_mb"] or 0.0, theirs["peak_rss_mb"])
+        for record in other["documents"]:
+            self.document(record["doc"]).update(record)
+
+    def to_dict(self) -> dict:
+        order = [n for n in self.STAGES if n in self.stages]
+        order += [n for n in self.stages if n not in self.STAGES]
+        return {
+            "stages": {name: self.stages[name] for name in order},
+            "documents": list(self.documents.values()),
+        }
+
+    def write_json(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        print(f"Written: {path}")
+
+    def print_summary(self, top: int = 10):
+        """Print stage totals and the slowest documents."""
+        print(f"\n{'stage':<16} {'wall s':>9} {'cpu s':>9} {'peak MB':>9} {'calls':>6}")
+        for name, t in self.to_dict()["stages"].items():
+            peak = f"{t['peak_rss_mb']:.1f}" if t["peak_rss_mb"] is not None else "n/a"
+            print(f"{name:<16} {t['wall_s']:>9.3f} {t['cpu_s']:>9.3f} {peak:>9} {t['calls']:>6}")
+
+        def doc_total(record):
+            return sum(v for k, v in record.items() if k.endswith("_s"))
+
+        slowest = sorted(self.documents.values(), key=doc_total, reverse=True)[:top]
+        if slowest:
+            print(f"\nSlowest {len(slowest)} documents:")
+            for record in slowest:
+                print(f"  {record['doc']:<12} {doc_total(record):>8.3f} s  pages={record.get('pages', '?')}")
+
+
+def _stage(metrics: Optional[ConversionMetrics], name: str, doc_eid: Optional[str] = None):
+    """``metrics.stage(...)``, or a no-op context when metrics are disabled."""
+    return metrics.stage(name, doc_eid) if metrics is not None else nullcontext()
+
+
+# ---------------------------------------------------------------------------
+# PDF Extraction
+# ---------------------------------------------------------------------------
+
+def _file_sha256(path: str) -> str:
+    """Return the hex SHA-256 digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# Identifies the converter code itself, so that any change to parsing or
+# generation invalidates every fingerprint in an incremental manifest.
+CONVERTER_FINGERPRINT = _file_sha256(os.path.abspath(__file__))
+
+MANIFEST_NAME = ".akn_manifest.json"
+
+
+def load_manifest(output_dir: str) -> dict:
+    """Load doc eId -> fingerprint from a previous run in ``output_dir``.
+
+    Entries whose XML file no longer exists are dropped so that those
+    documents are regenerated.
+    """
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    return {
+        doc_eid: fingerprint
+        for doc_eid, fingerprint in manifest.get("documents", {}).items()
+        if os.path.exists(os.path.join(output_dir, f"{doc_eid}.xml"))
+    }
+
+
+def write_manifest(final_acts: "FinalActs", output_dir: str):
+    """Record the fingerprint of every converted document for the next run."""
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"converter": CONVERTER_FINGERPRINT, "documents": final_acts.fingerprints}, f, indent=2)
+
+
+class PageTextCache:
+    """Persistent SQLite store of raw page text and, for --layout, page spans.
+
+    Rows are keyed by the PDF's SHA-256, the page index and the PyMuPDF
+    version, so a changed PDF or a PyMuPDF upgrade never serves stale text.
+    Only the raw ``get_text`` output is cached; header cleaning is cheap and
+    stays live so that changes to ``_clean_page_text`` take effect at once.
+
+    Layout rows (table ``layouts``) also carry ``PageLayout.CACHE_FORMAT``
+    and hold the raw span columns and ``find_tables()`` cells of a page;
+    span classification likewise stays live.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.version = fitz.VersionBind
+        # Used by the extraction thread in --pipeline mode, never concurrently
+        self.conn = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " pdf_sha256 TEXT NOT NULL,"
+            " page INTEGER NOT NULL,"
+            " fitz_version TEXT NOT NULL,"
+            " text BLOB NOT NULL,"
+            " PRIMARY KEY (pdf_sha256, page, fitz_version)"
+            ") WITHOUT ROWID"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS layouts ("
+            " pdf_sha256 TEXT NOT NULL,"
+            " page INTEGER NOT NULL,"
+            " fitz_version TEXT NOT NULL,"
+            " format INTEGER NOT NULL,"
+            " spans BLOB NOT NULL,"
+            " PRIMARY KEY (pdf_sha256, page, fitz_version, format)"
+            ") WITHOUT ROWID"
+        )
+        self.conn.commit()
+        self._pages = {}  # pdf_sha256 -> {page: text}
+
+    def close(self):
+        self.conn.close()
+
+    def _load(self, pdf_sha256: str) -> dict:
+        """Load every cached page of one PDF with a single query."""
+        pages = self._pages.get(pdf_sha256)
+        if pages is None:
+            rows = self.conn.execute(
+                "SELECT page, text FROM pages WHERE pdf_sha256 = ? AND fitz_version = ?",
+                (pdf_sha256, self.version),
+            )
+            pages = {page: zlib.decompress(blob).decode("utf-8") for page, blob in rows}
+            self._pages[pdf_sha256] = pages
+        return pages
+
+    def get(self, pdf_sha256: str, page_num: int) -> Optional[str]:
+        return self._load(pdf_sha256).get(page_num)
+
+    def put(self, pdf_sha256: str, page_num: int, text: str):
+        self._load(pdf_sha256)[page_num] = text
+        self.conn.execute(
+            "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?)",
+            (pdf_sha256, page_num, self.version, zlib.compress(text.encode("utf-8"))),
+        )
+        self.conn.commit()
+
+    def get_layout(self, pdf_sha256: str, page_num: int) -> Optional[dict]:
+        """Cached ``PageLayout.cache_record()`` of a page, or None."""
+        row = self.conn.execute(
+            "SELECT spans FROM layouts WHERE pdf_sha256 = ? AND page = ? AND fitz_version = ? AND format = ?",
+            (pdf_sha256, page_num, self.version, PageLayout.CACHE_FORMAT),
+        ).fetchone()
+        return json.loads(zlib.decompress(row[0])) if row else None
+
+    def put_layout(self, pdf_sha256: str, page_num: int, record: dict):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO layouts VALUES (?, ?, ?, ?, ?)",
+            (pdf_sha256, page_num, self.version, PageLayout.CACHE_FORMAT,
+             zlib.compress(json.dumps(record).encode("utf-8"))),
+        )
+        self.conn.commit()
+
+
+def _table_cell_text(text: Optional[str]) -> str:
+    """Text of a find_tables() cell on one line; merged cells (None) are empty."""
+    if not text:
+        return ""
+    return WHITESPACE_RE.sub(" ", NORMALIZE_RE.sub(_normalize_match, text)).strip()
+
+
+class PageLayout:
+    """Font-aware spans of one page, stored column-wise for vectorised analysis.
+
+    Each span contributes one row to the float32 arrays ``x0``, ``y0``,
+    ``x1``, ``y1`` and ``size``, the int32 arrays ``flags`` and ``line``
+    (running line number on the page) and ``font`` (index into ``fonts``);
+    ``text`` holds the span strings in the same order.
+
+    Spans are then classified with array comparisons rather than text
+    heuristics. The body font size is the size carrying the most characters;
+    smaller spans above the first body line are the page header (e.g. the
+    "Res. 2" / "21" block), smaller spans below the last body line are
+    footnotes, or footer if they sit in the bottom margin. Superscript spans
+    within the body are footnote reference markers.
+
+    Italic spans (flag or font name) that open a body line are keyword
+    spans, as section keywords are set in italics; a span of one or two
+    digits (optionally with a decimal, "4.1") that opens a line at the left
+    margin is a paragraph number. ``body_text`` ends the line after either,
+    so "*resolves* that ..." or "3<tab>to ..." set on one line still reach
+    the parser as a keyword line or a number line.
+
+    Pages whose spans look like a grid (``looks_tabular``) are also passed
+    to PyMuPDF's table finder; the cell texts of each table go to
+    ``tables``, and ``body_text`` has a TABLE_REF line in place of the
+    spans inside it.
+
+    ``spans`` and ``raw_tables`` (``cache_record()``) are what a
+    PageTextCache stores. A layout built from them only needs ``page`` if
+    the table finder has not run on it yet.
+    """
+
+    FLAG_SUPERSCRIPT = 1
+    FLAG_ITALIC = 2
+    FOOTER_BAND = 0.92  # fraction of page height below which small text is footer
+    GRID_MIN_COLUMNS = 3  # text lines side by side on one baseline ...
+    GRID_MIN_ROWS = 3     # ... on this many baselines before find_tables() runs
+    CACHE_FORMAT = 1      # layout of cache_record(); part of the PageTextCache key
+
+    def __init__(self, spans: dict, page: Optional["fitz.Page"] = None,
+                 raw_tables: Optional[list] = None):
+        self.spans = spans
+        self.width = spans["width"]
+        self.height = spans["height"]
+        self.fonts = spans["fonts"]
+        self.text = spans["text"]
+        boxes = np.asarray(spans["bbox"], dtype=np.float32).reshape(-1, 4)
+        self.x0, self.y0, self.x1, self.y1 = boxes.T
+        self.size = np.asarray(spans["size"], dtype=np.float32)
+        self.flags = np.asarray(spans["flags"], dtype=np.int32)
+        self.font = np.asarray(spans["font"], dtype=np.int16)
+        self.line = np.asarray(spans["line"], dtype=np.int32)
+        self._classify()
+
+        self.raw_tables = None  # find_tables() bbox and cells, once it has run
+        self.tables = []  # cell texts (list of rows) of each table on the page
+        self.table_of = np.full(len(self.text), -1, dtype=np.int16)  # index into tables, or -1
+        if self.looks_tabular():
+            self.raw_tables = raw_tables if raw_tables is not None else self._find_tables(page)
+            self._place_tables()
+
+    @classmethod
+    def from_page(cls, page: "fitz.Page") -> "PageLayout":
+        return cls(cls.read_spans(page), page)
+
+    @staticmethod
+    def read_spans(page: "fitz.Page") -> dict:
+        """The spans of ``page`` as plain lists, one entry per span."""
+        fonts = []
+        font_ids = {}
+        text, bbox, size, flags, font, line = [], [], [], [], [], []
+
+        line_no = 0
+        for block in page.get_text("dict")["blocks"]:
+            for ln in block.get("lines", ()):
+                for span in ln["spans"]:
+                    name = span["font"]
+                    if name not in font_ids:
+                        font_ids[name] = len(fonts)
+                        fonts.append(name)
+                    text.append(span["text"])
+                    bbox.append(list(span["bbox"]))
+                    size.append(span["size"])
+                    flags.append(span["flags"])
+                    font.append(font_ids[name])
+                    line.append(line_no)
+                line_no += 1
+        return {"width": page.rect.width, "height": page.rect.height, "fonts": fonts,
+                "text": text, "bbox": bbox, "size": size, "flags": flags, "font": font, "line": line}
+
+    def cache_record(self) -> dict:
+        """What PageTextCache stores for this page."""
+        return {"spans": self.spans, "tables": self.raw_tables}
+
+    def _classify(self):
+        n = len(self.text)
+        lengths = np.fromiter((len(t.strip()) for t in self.text), dtype=np.int32, count=n)
+        blank = lengths == 0
+        self.is_blank = blank
+        self.is_note_ref = np.zeros(n, dtype=bool)
+
+        self.is_header = np.zeros(n, dtype=bool)
+        self.is_footer = np.zeros(n, dtype=bool)
+        self.is_footnote = np.zeros(n, dtype=bool)
+        self.is_keyword = np.zeros(n, dtype=bool)
+        self.is_para_num = np.zeros(n, dtype=bool)
+        self.break_after = np.zeros(n, dtype=bool)  # end the output line after this span
+        self.body_size = 0.0
+        italic_fonts = np.fromiter(
+            (("Italic" in f) or ("Oblique" in f) for f in self.fonts), dtype=bool, count=len(self.fonts)
+        )
+        self.is_italic = ((self.flags & self.FLAG_ITALIC) != 0) | italic_fonts[self.font]
+        if not n or not lengths.any():
+            return
+
+        sizes = np.round(self.size, 1)
+        values, inverse = np.unique(sizes, return_inverse=True)
+        self.body_size = float(values[np.bincount(inverse, weights=lengths).argmax()])
+
+        small = sizes < self.body_size - 0.5
+        body_like = ~small & ~blank
+        if not body_like.any():
+            return
+        top = self.y0[body_like].min()
+        bottom = self.y1[body_like].max()
+        self.is_header = small & (self.y1 <= top + 1)
+        below = small & (self.y0 >= bottom - 1) & ~self.is_header
+        in_footer_band = self.y0 >= self.height * self.FOOTER_BAND
+        self.is_footer = below & in_footer_band
+        self.is_footnote = below & ~in_footer_band
+        superscript = (self.flags & self.FLAG_SUPERSCRIPT) != 0
+        self.is_note_ref = small & superscript & ~blank & self.is_body
+
+        content = body_like & self.is_body
+        next_same_line = np.zeros(n, dtype=bool)
+        next_same_line[:-1] = self.line[1:] == self.line[:-1]
+
+        # Keyword: an italic run from the start of the line
+        self.is_keyword = content & self._leading(self.is_italic | blank, next_same_line)
+
+        # Paragraph number: the first text on its line, at the left margin,
+        # "1", "12" or "4.1" and nothing else
+        left = self.x0[content].min()
+        candidates = np.flatnonzero(content & self._leading(blank, next_same_line, inclusive=False)
+                                    & ~superscript & (self.x0 <= left + 1) & (lengths <= 5))
+        if len(candidates):
+            stripped = np.char.strip(np.asarray([self.text[i] for i in candidates], dtype=str))
+            dot = np.char.find(stripped, ".")
+            int_len = np.where(dot < 0, lengths[candidates], dot)
+            numeric = np.char.isdigit(np.char.replace(stripped, ".", "", count=1)) & (int_len <= 2)
+            self.is_para_num[candidates[numeric]] = True
+
+        next_keyword = np.zeros(n, dtype=bool)
+        next_keyword[:-1] = self.is_keyword[1:]
+        self.break_after = (self.is_para_num | (self.is_keyword & ~next_keyword)) & next_same_line
+
+    @staticmethod
+    def _leading(mask: np.ndarray, next_same_line: np.ndarray, inclusive: bool = True) -> np.ndarray:
+        """Spans preceded on their line only by ``mask`` spans (and in ``mask`` themselves if ``inclusive``)."""
+        line_start = np.ones(len(mask), dtype=bool)
+        line_start[1:] = ~next_same_line[:-1]
+        miss = (~mask).astype(np.int32)
+        misses = np.cumsum(miss) - miss  # non-mask spans before each span
+        first = np.flatnonzero(line_start)[np.cumsum(line_start) - 1]
+        leading = misses == misses[first]
+        return leading & mask if inclusive else leading
+
+    @property
+    def is_body(self) -> np.ndarray:
+        return ~(self.is_header | self.is_footer | self.is_footnote)
+
+    def looks_tabular(self) -> bool:
+        """Cheap pre-check for ``_find_tables``.
+
+        PyMuPDF puts each table cell on a text line of its own, so a table
+        row shows up as several lines on one baseline. Running text has one
+        line per baseline, or two with a paragraph number or list label.
+        """
+        content = self.is_body & ~self.is_blank
+        if not content.any():
+            return False
+        baseline = np.round(self.y1[content]).astype(np.int32)
+        segments = np.unique(np.stack([baseline, self.line[content]]), axis=1)
+        _, per_baseline = np.unique(segments[0], return_counts=True)
+        return int((per_baseline >= self.GRID_MIN_COLUMNS).sum()) >= self.GRID_MIN_ROWS
+
+    @staticmethod
+    def _find_tables(page: "fitz.Page") -> list:
+        """find_tables() result as [{"bbox": [x0, y0, x1, y1], "cells": rows of raw cell text}]."""
+        return [{"bbox": list(table.bbox), "cells": table.extract()}
+                for table in page.find_tables().tables]
+
+    def _place_tables(self):
+        centre_x = (self.x0 + self.x1) / 2
+        centre_y = (self.y0 + self.y1) / 2
+        for table in self.raw_tables:
+            rows = [[_table_cell_text(cell) for cell in row] for row in table["cells"]]
+            if not any(any(row) for row in rows):
+                continue
+            x0, y0, x1, y1 = table["bbox"]
+            inside = (centre_x >= x0) & (centre_x <= x1) & (centre_y >= y0) & (centre_y <= y1)
+            self.table_of[inside & (self.table_of < 0)] = len(self.tables)
+            self.tables.append(rows)
+
+    def lines_text(self, mask: np.ndarray, note_refs: Optional[np.ndarray] = None,
+                   breaks: Optional[np.ndarray] = None, first_table: Optional[int] = None) -> str:
+        """Join the selected spans line by line, one newline per line.
+
+        Spans flagged in ``note_refs`` are wrapped in NOTE_REF_START/END; a
+        span flagged in ``breaks`` ends its line early. With ``first_table``,
+        the spans of each table are replaced by one TABLE_REF line holding
+        ``first_table`` plus the table's index on the page.
+        """
+        out = []
+        current = -1
+        parts = []
+        placed = set()
+        for i in np.flatnonzero(mask):
+            if first_table is not None and self.table_of[i] >= 0:
+                k = int(self.table_of[i])
+                if k not in placed:
+                    placed.add(k)
+                    if parts:
+                        out.append("".join(parts))
+                        parts = []
+                    out.append(f"{TABLE_REF_START}{first_table + k}{TABLE_REF_END}")
+                continue
+            if self.line[i] != current:
+                if parts:
+                    out.append("".join(parts))
+                parts = []
+                current = self.line[i]
+            if note_refs is not None and note_refs[i]:
+                parts.append(f"{NOTE_REF_START}{self.text[i].strip()}{NOTE_REF_END}")
+            else:
+                parts.append(self.text[i])
+            if breaks is not None and breaks[i]:
+                out.append("".join(parts))
+                parts = []
+        if parts:
+            out.append("".join(parts))
+        if first_table is not None:
+            out.extend(f"{TABLE_REF_START}{first_table + k}{TABLE_REF_END}"
+                       for k in range(len(self.tables)) if k not in placed)
+        return "".join(line + "\n" for line in out)
+
+    def body_text(self, mark_note_refs: bool = False, first_table: int = 0) -> str:
+        """Page text without header, footer and footnote spans.
+
+        Keyword runs and paragraph numbers end their line (``break_after``);
+        each table is a TABLE_REF line numbered from ``first_table``, the
+        number of tables on the document's earlier pages.
+        """
+        return self.lines_text(self.is_body, self.is_note_ref if mark_note_refs else None,
+                               self.break_after, first_table)
+
+    def footnotes(self, page_num: int = 0) -> list:
+        """Group the footnote-band lines into Footnote items.
+
+        A line opens a new note when it starts with a marker, i.e. a
+        superscript or smaller-than-the-rest span, or "1 text" on the first
+        line; other lines continue the current note.
+        """
+        notes = []
+        lines = {}
+        for i in np.flatnonzero(self.is_footnote):
+            lines.setdefault(int(self.line[i]), []).append(i)
+
+        for spans in lines.values():
+            spans = [i for i in spans if self.text[i].strip()]
+            if not spans:
+                continue
+            first = spans[0]
+            line_text = " ".join(self.text[i].strip() for i in spans)
+            marker_span = (
+                (self.flags[first] & self.FLAG_SUPERSCRIPT)
+                or (len(spans) > 1 and self.size[first] < self.size[spans[1]] - 0.5)
+            )
+            m = NOTE_MARKER_RE.match(line_text)
+            if m and (marker_span or not notes):
+                notes.append(Footnote(marker=m.group(1), text=m.group(2).strip(), page=page_num))
+            elif notes:
+                notes[-1].text = f"{notes[-1].text} {line_text}".strip()
+            else:
+                notes.append(Footnote(marker="", text=line_text, page=page_num))
+        return notes
+
+
+class PDFExtractor:
+    """Extracts structured text from the ITU Final Acts PDF."""
+
+    def __init__(self, pdf_path: str, cache: Optional[PageTextCache] = None,
+                 pdf_sha256: Optional[str] = None, layout: bool = False):
+        self.pdf_path = pdf_path
+        self.doc = fitz.open(pdf_path)
+        self.toc = self.doc.get_toc()
+        self.layout = layout
+        self.cache = cache
+        self.pdf_sha256 = None
+        if cache is not None:
+            self.pdf_sha256 = pdf_sha256 or _file_sha256(pdf_path)
+
+    def close(self):
+        self.doc.close()
+
+    def get_page_text(self, page_num: int) -> str:
+        if self.cache is None:
+            return self.doc[page_num].get_text("text")
+        text = self.cache.get(self.pdf_sha256, page_num)
+        if text is None:
+            text = self.doc[page_num].get_text("text")
+            self.cache.put(self.pdf_sha256, page_num, text)
+        return text
+
+    def get_page_layout(self, page_num: int) -> PageLayout:
+        """Column-oriented spans for a page.
+
+        With a page cache, the spans and table cells are read from it, and
+        stored there after the first extraction.
+        """
+        if self.cache is None:
+            return PageLayout.from_page(self.doc[page_num])
+        return self._cached_page_layout(page_num)
+
+    def _cached_page_layout(self, page_num: int) -> PageLayout:
+        record = self.cache.get_layout(self.pdf_sha256, page_num)
+        if record is None:
+            layout = PageLayout.from_page(self.doc[page_num])
+        else:
+            layout = PageLayout(record["spans"], self.doc[page_num], record["tables"])
+            if layout.raw_tables is None or record["tables"] is not None:
+                return layout
+        # new page, or the table finder ran on it for the first time
+        self.cache.put_layout(self.pdf_sha256, page_num, layout.cache_record())
+        return layout
+
+    def extract_text_range(self, start_page: int, end_page: int) -> str:
+        """Extract plain text for a range of pages (0-indexed, inclusive)."""
+        return self.extract_page_range(start_page, end_page)[0]
+
+    def extract_page_range(self, start_page: int, end_page: int) -> tuple:
+        """Text, footnotes and tables of a range of pages (0-indexed, inclusive).
+
+        The pages of ``iter_pages``, their texts joined by newlines.
+        """
+        parts, footnotes, tables = [], [], []
+        for text, page_notes, page_tables in self.iter_pages(start_page, end_page):
+            parts.append(text)
+            footnotes.extend(page_notes)
+            tables.extend(page_tables)
+        return "\n".join(parts), footnotes, tables
+
+    def iter_pages(self, start_page: int, end_page: int) -> Iterator[tuple]:
+        """Yield (text, footnotes, tables) for each page of a range (0-indexed, inclusive).
+
+        Each page is read from the PDF only when the caller asks for it. In
+        layout mode, headers, footers and footnotes are dropped by font size
+        and position (PageLayout) instead of by ``_clean_page_text``, and
+        footnote reference markers are kept as NOTE_REF_START/END pairs,
+        tables as TABLE_REF lines numbered across the range. Footnotes and
+        tables come from the same PageLayout as the text; without layout
+        mode both lists are empty.
+        """
+        n_tables = 0
+        for pg in range(start_page, min(end_page + 1, len(self.doc))):
+            if self.layout:
+                layout = self.get_page_layout(pg)
+                text = layout.body_text(mark_note_refs=True, first_table=n_tables)
+                footnotes = layout.footnotes(pg)
+                tables = [Table(rows=rows, page=pg) for rows in layout.tables]
+                n_tables += len(tables)
+            else:
+                text = self._clean_page_text(self.get_page_text(pg), pg)
+                footnotes, tables = [], []
+            yield text, footnotes, tables
+
+    def _clean_page_text(self, text: str, page_num: int) -> str:
+        """Remove page headers/footers from extracted text.
+
+        The header block at the top of each page typically looks like:
+            (blank) / "Res. 2" / "21" (page number)   -- or reversed order
+        We identify the doc-reference line and the page-number line that is
+        immediately adjacent to it (within 1 line). Lines separated from
+        the doc-ref by a blank line are content (e.g. paragraph numbers)
+        and must NOT be removed.
+        """
+        lines = text.split("\n")
+        skip_indices = set()
+
+        # Find the doc-reference line in the first 5 lines
+        doc_ref_idx = None
+        for i in range(min(5, len(lines))):
+            if PAGE_DOC_REF_RE.match(lines[i]):
+                doc_ref_idx = i
+                skip_indices.add(i)
+                break
+
+        if doc_ref_idx is not None:
+            # Remove blank lines before the doc-ref
+            for j in range(doc_ref_idx):
+                if lines[j].strip() == "":
+                    skip_indices.add(j)
+
+            # The page number is usually the line immediately before or after
+            # the doc-ref (not separated by a blank line)
+            for adj in [doc_ref_idx - 1, doc_ref_idx + 1]:
+                if 0 <= adj < len(lines):
+                    if PAGE_NUMBER_RE.match(lines[adj]):
+                        skip_indices.add(adj)
+                    elif lines[adj].strip() == "":
+                        skip_indices.add(adj)
+
+        cleaned = [line for i, line in enumerate(lines) if i not in skip_indices]
+        return "\n".join(cleaned)
+
+
+# ---------------------------------------------------------------------------
+# Document Parser
+# ---------------------------------------------------------------------------
+
+class FinalActsParser:
+    """Parses extracted text into structured DocumentItem objects."""
+
+    DOC_HEADER_RE = re.compile(
+        r"^(RESOLUTION|DECISION|RECOMMENDATION)\s+"
+        r"(\d+(?:\s*\([^)]+\))?)\s*"
+        r"(?:\(([^)]+)\))?\s*$",
+        re.MULTILINE,
+    )
+
+    DOC_HEADER_WITH_TITLE_RE = re.compile(
+        r"(RESOLUTION|DECISION|RECOMMENDATION)\s+"
+        r"(\d+)\s*"
+        r"\(([^)]+)\)\s*"
+        r"(?:\-\s*)?"
+    )
+
+    def __init__(self, extractor: PDFExtractor, metrics: Optional[ConversionMetrics] = None,
+                 conference: Optional[dict] = None):
+        self.extractor = extractor
+        self.toc = extractor.toc
+        self.metrics = metrics
+        self._matches = None  # pattern name -> hits in the current document, with metrics
+        self.conference = conference or {}  # CONFERENCE_FIELDS overrides for FinalActs
+        acts = FinalActs(**self.conference)
+        self.enacting_formula_re = re.compile(
+            rf"(The {re.escape(acts.conference)}.*?(?:{re.escape(acts.location)},\s*{acts.year}\)),?)",
+            re.DOTALL,
+        )
+
+    def parse(self, workers: int = 1, manifest: Optional[dict] = None) -> FinalActs:
+        """Parse every TOC document entry into a FinalActs structure.
+
+        With ``workers > 1`` the entries are split into contiguous shards and
+        parsed in a process pool; results are merged back in TOC order.
+        Documents whose fingerprint matches ``manifest`` (from a previous run)
+        are not parsed; they are listed in ``FinalActs.unchanged``.
+        """
+        ranges = self.document_ranges()
+        manifest = manifest or {}
+        if workers > 1 and len(ranges) > 1:
+            results = self._parse_parallel(ranges, workers, manifest)
+        else:
+            results = [self._parse_entry(entry, end_page, manifest) for entry, end_page in ranges]
+        return self.assemble(ranges, results, manifest)
+
+    def document_ranges(self) -> list:
+        """(TOC entry, last page) of every document, in TOC order."""
+        with _stage(self.metrics, "toc_parsing"):
+            doc_entries = self._find_document_entries()
+
+        ranges = []
+        for i, entry in enumerate(doc_entries):
+            end_page = (doc_entries[i + 1]["page"] - 1
+                        if i + 1 < len(doc_entries)
+                        else len(self.extractor.doc) - 1)
+            ranges.append((entry, end_page))
+        return ranges
+
+    def assemble(self, ranges: list, results: list, manifest: Optional[dict] = None) -> FinalActs:
+        """Build FinalActs from the (doc_item, fingerprint) result of each range."""
+        acts = FinalActs(**self.conference)
+        manifest = manifest or {}
+        for (entry, _), (doc_item, fingerprint) in zip(ranges, results):
+            if doc_item:
+                part = entry.get("part", "other")
+                if part not in acts.parts:
+                    acts.parts[part] = []
+                acts.parts[part].append(doc_item)
+
+                doc_eid = self._entry_eid(entry)
+                acts.fingerprints[doc_eid] = fingerprint
+                if manifest.get(doc_eid) == fingerprint:
+                    acts.unchanged.add(doc_eid)
+
+        return acts
+
+    @staticmethod
+    def _entry_eid(entry: dict) -> str:
+        """Document eId for a TOC entry (same as AKNGenerator._doc_eid)."""
+        return f"{entry['type'].lower()[:3]}_{entry['number']}"
+
+    @classmethod
+    def _fingerprint(cls, entry: dict, text: str, footnotes: Optional[list] = None,
+                     tables: Optional[list] = None) -> str:
+        """Hash of the converter code, the TOC entry and the extracted content."""
+        digest = cls._new_fingerprint(entry)
+        digest.update(text.encode("utf-8"))
+        return cls._finish_fingerprint(digest, footnotes, tables)
+
+    @staticmethod
+    def _new_fingerprint(entry: dict):
+        """``_fingerprint`` digest so far: the converter code and the TOC entry.
+
+        The caller adds the text (the pages joined by newlines), then
+        ``_finish_fingerprint`` the footnotes and tables.
+        """
+        digest = hashlib.sha256(CONVERTER_FINGERPRINT.encode("ascii"))
+        digest.update(json.dumps(entry, sort_keys=True).encode("utf-8"))
+        return digest
+
+    @staticmethod
+    def _finish_fingerprint(digest, footnotes: Optional[list] = None,
+                            tables: Optional[list] = None) -> str:
+        for note in footnotes or ():
+            digest.update(f"\0{note.marker}\0{note.text}".encode("utf-8"))
+        for table in tables or ():
+            digest.update(f"\0{table.page}\0{json.dumps(table.rows)}".encode("utf-8"))
+        return digest.hexdigest()
+
+    def _parse_entry(self, entry: dict, end_page: int,
+                     manifest: Optional[dict] = None) -> tuple:
+        """Extract and parse the pages of a single TOC entry.
+
+        Returns (doc_item, fingerprint). Pages are parsed as they are
+        extracted (``_stream_entry``), unless ``manifest`` has a fingerprint
+        for the document: then the pages are extracted first, and if the
+        fingerprint still matches, parsing is skipped and doc_item only
+        carries the TOC-derived header fields.
+        """
+        if manifest and self._entry_eid(entry) in manifest:
+            return self._parse_extracted(entry, *self._extract_entry(entry, end_page), manifest)
+        return self._stream_entry(entry, end_page)
+
+    def _stream_entry(self, entry: dict, end_page: int) -> tuple:
+        """Parse the pages of a TOC entry while they are extracted: (doc_item, fingerprint).
+
+        Each page from ``PDFExtractor.iter_pages`` goes straight into a
+        DocumentTextStream, so the first sections are parsed, and their
+        text released, before the last page is read.
+        """
+        doc_eid = self._entry_eid(entry)
+        digest = self._new_fingerprint(entry)
+        footnotes, tables = [], []
+        if self.metrics is not None:
+            self._matches = {}
+        stream = DocumentTextStream(self, entry)
+        pages = self.extractor.iter_pages(entry["page"], end_page)
+        n_pages = 0
+        while True:
+            with _stage(self.metrics, "extraction", doc_eid):
+                page = next(pages, None)
+            if page is None:
+                break
+            text, page_notes, page_tables = page
+            digest.update(f"\n{text}".encode("utf-8") if n_pages else text.encode("utf-8"))
+            n_pages += 1
+            footnotes.extend(page_notes)
+            tables.extend(page_tables)
+            with _stage(self.metrics, "section_parsing", doc_eid):
+                stream.feed(text)
+        with _stage(self.metrics, "section_parsing", doc_eid):
+            doc_item = stream.close()
+        doc_item.footnotes = footnotes
+        doc_item.tables = tables
+
+        if self.metrics is not None:
+            record = self.metrics.document(doc_eid)
+            record["pages"] = end_page - entry["page"] + 1
+            record.setdefault("matches", {}).update(self._matches)
+            self._matches = None
+        return doc_item, self._finish_fingerprint(digest, footnotes, tables)
+
+    def _extract_entry(self, entry: dict, end_page: int) -> tuple:
+        """Extract the pages of a TOC entry: (text, footnotes, tables, fingerprint)."""
+        doc_eid = self._entry_eid(entry)
+        with _stage(self.metrics, "extraction", doc_eid):
+            text, footnotes, tables = self.extractor.extract_page_range(entry["page"], end_page)
+
+        if self.metrics is not None:
+            self.metrics.document(doc_eid)["pages"] = end_page - entry["page"] + 1
+        return text, footnotes, tables, self._fingerprint(entry, text, footnotes, tables)
+
+    def _parse_extracted(self, entry: dict, text: str, footnotes: list, tables: list,
+                         fingerprint: str, manifest: Optional[dict] = None) -> tuple:
+        """Parse the ``_extract_entry`` output of a TOC entry; see ``_parse_entry``."""
+        doc_eid = self._entry_eid(entry)
+        if manifest and manifest.get(doc_eid) == fingerprint:
+            return self._header_item(entry), fingerprint
+
+        if self.metrics is not None:
+            self._matches = {}
+        with _stage(self.metrics, "section_parsing", doc_eid):
+            doc_item = self._parse_document_text(text, entry)
+            if doc_item:
+                doc_item.footnotes = footnotes
+                doc_item.tables = tables
+
+        if self.metrics is not None:
+            self.metrics.document(doc_eid).setdefault("matches", {}).update(self._matches)
+            self._matches = None
+        return doc_item, fingerprint
+
+    def _count_matches(self, pattern: str, hits: int):
+        """Add ``hits`` of the named pattern to the current document's match counts."""
+        if self._matches is not None:
+            self._matches[pattern] = self._matches.get(pattern, 0) + hits
+
+    def _parse_parallel(self, ranges: list, workers: int, manifest: dict) -> list:
+        """Parse (entry, end_page) ranges across a process pool, preserving order.
+
+        Shards are contiguous so each worker reads neighbouring pages, and there
+        are a few more shards than workers so one annex-heavy document does not
+        leave the other processes idle.
+        """
+        shards = self._shards(ranges, min(len(ranges), workers * 4))
+
+        cache = self.extractor.cache
+        cache_path = cache.path if cache is not None else None
+
+        results = []
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for shard_results, shard_metrics in pool.map(
+                _parse_document_shard,
+                [self.extractor.pdf_path] * len(shards),
+                shards,
+                [cache_path] * len(shards),
+                [self.extractor.pdf_sha256] * len(shards),
+                [self.metrics is not None] * len(shards),
+                [manifest] * len(shards),
+                [self.extractor.layout] * len(shards),
+                [self.conference] * len(shards),
+            ):
+                results.extend(shard_results)
+                if shard_metrics is not None:
+                    self.metrics.merge(shard_metrics)
+        return results
+
+    @staticmethod
+    def _shards(ranges: list, n_shards: int) -> list:
+        """Split ranges into at most ``n_shards`` contiguous, equal-sized shards."""
+        if not ranges:
+            return []
+        size = -(-len(ranges) // max(n_shards, 1))
+        return [ranges[i:i + size] for i in range(0, len(ranges), size)]
+
+    def _find_document_entries(self) -> list:
+        """Use the PDF TOC to find each document entry."""
+        entries = []
+        current_part = "other"
+
+        for level, title, page in self.toc:
+            page_idx = page - 1
+
+            part_match = TOC_PART_RE.match(title.strip())
+            if part_match:
+                current_part = part_match.group(2).strip()
+                continue
+
+            doc_match = TOC_DOCUMENT_RE.match(title.strip())
+            if doc_match:
+                entries.append({
+                    "type": doc_match.group(1),
+                    "number": doc_match.group(2),
+                    "revision": doc_match.group(3).strip(),
+                    "title": doc_match.group(4).strip(),
+                    "page": page_idx,
+                    "part": current_part,
+                })
+
+        return entries
+
+    @staticmethod
+    def _header_item(entry: dict) -> DocumentItem:
+        """A DocumentItem carrying only the TOC-derived header fields."""
+        return DocumentItem(
+            doc_type=entry["type"],
+            number=entry["number"],
+            revision=entry["revision"],
+            title=entry["title"],
+        )
+
+    def _parse_document_text(self, raw_text: str, entry: dict) -> Optional[DocumentItem]:
+        """Parse the full text of a single document (resolution/decision/recommendation)."""
+        stream = DocumentTextStream(self, entry)
+        stream.feed(raw_text)
+        return stream.close()
+
+    def _normalize_text(self, text: str, strip: bool = True) -> str:
+        """Normalize whitespace and fix common PDF extraction artifacts.
+
+        One NORMALIZE_RE pass, byte-identical to the former chain of six
+        re.sub() passes (dashes, double quotes, single quotes, space runs,
+        newline runs, invalid characters). DocumentTextStream normalises
+        pieces of a document and passes ``strip=False``.
+        """
+        text = NORMALIZE_RE.sub(_normalize_match, text)
+        return text.strip() if strip else text
+
+    def _clean_whitespace(self, text: str) -> str:
+        return WHITESPACE_RE.sub(" ", text).strip()
+
+    def _parse_preamble_section(self, keyword: str, text: str) -> PreambleSection:
+        """Parse a preamble section into lettered paragraphs."""
+        section = PreambleSection(keyword=keyword)
+
+        # Try to split by letter labels: a), b), c) ...
+        parts = LETTER_ITEM_SPLIT_RE.split(text)
+        self._count_matches("LETTER_ITEM_SPLIT_RE", len(parts) // 2)
+
+        if len(parts) > 1:
+            # First part may be intro text before a)
+            if parts[0].strip():
+                section.paragraphs.append(
+                    SubParagraph(label="", text=self._clean_whitespace(parts[0]))
+                )
+            for j in range(1, len(parts), 2):
+                label = parts[j]
+                body = parts[j + 1] if j + 1 < len(parts) else ""
+                section.paragraphs.append(
+                    SubParagraph(label=label, text=self._clean_whitespace(body))
+                )
+        else:
+            section.paragraphs.append(
+                SubParagraph(label="", text=self._clean_whitespace(text))
+            )
+
+        return section
+
+    def _parse_operative_section(self, keyword: str, text: str) -> OperativeSection:
+        """Parse an operative section into numbered paragraphs."""
+        section = OperativeSection(keyword=keyword)
+
+        # Numbers appear on their own line in the PDF extraction.
+        # Match: newline, optional whitespace, one or more digits (possibly with
+        # a decimal sub-number like 1.1), followed by whitespace/newline.
+        # The number must NOT look like a year (4 digits >= 1900).
+        parts = PARAGRAPH_NUMBER_SPLIT_RE.split(text)
+        self._count_matches("PARAGRAPH_NUMBER_SPLIT_RE", len(parts) // 2)
+
+        if len(parts) > 1:
+            if parts[0].strip():
+                section.paragraphs.append(
+                    NumberedParagraph(num="", text=self._clean_whitespace(parts[0]))
+                )
+            for j in range(1, len(parts), 2):
+                num = parts[j]
+                body = parts[j + 1] if j + 1 < len(parts) else ""
+                para = NumberedParagraph(
+                    num=num,
+                    text=self._clean_whitespace(body),
+                )
+                self._parse_sub_paragraphs(body, para)
+                section.paragraphs.append(para)
+        else:
+            # Fallback: try "10 that..." pattern (number at start of line
+            # followed directly by text, as seen for paragraph 10+)
+            parts2 = INLINE_PARAGRAPH_NUMBER_SPLIT_RE.split(text)
+            self._count_matches("INLINE_PARAGRAPH_NUMBER_SPLIT_RE", len(parts2) // 2)
+            if len(parts2) > 2:
+                if parts2[0].strip():
+                    section.paragraphs.append(
+                        NumberedParagraph(num="", text=self._clean_whitespace(parts2[0]))
+                    )
+                for j in range(1, len(parts2), 2):
+                    num = parts2[j]
+                    body = parts2[j + 1] if j + 1 < len(parts2) else ""
+                    para = NumberedParagraph(
+                        num=num,
+                        text=self._clean_whitespace(body),
+                    )
+                    self._parse_sub_paragraphs(body, para)
+                    section.paragraphs.append(para)
+            else:
+                section.paragraphs.append(
+                    NumberedParagraph(num="", text=self._clean_whitespace(text))
+                )
+
+        return section
+
+    def _parse_sub_paragraphs(self, text: str, para: NumberedParagraph):
+        """Extract sub-numbered items like 1.1, 1.2, or a), b) within a paragraph."""
+        # Sub-numbers like 1.1, 1.2
+        sub_parts = DECIMAL_ITEM_SPLIT_RE.split(text)
+        self._count_matches("DECIMAL_ITEM_SPLIT_RE", len(sub_parts) // 2)
+        if len(sub_parts) > 2:
+            para.text = self._clean_whitespace(sub_parts[0])
+            for j in range(1, len(sub_parts), 2):
+                label = sub_parts[j]
+                body = sub_parts[j + 1] if j + 1 < len(sub_parts) else ""
+                para.sub_paragraphs.append(
+                    SubParagraph(label=label, text=self._clean_whitespace(body))
+                )
+            return
+
+        # Letter sub-paragraphs: a), b)
+        sub_parts = LETTER_ITEM_SPLIT_RE.split(text)
+        self._count_matches("LETTER_ITEM_SPLIT_RE", len(sub_parts) // 2)
+        if len(sub_parts) > 2:
+            para.text = self._clean_whitespace(sub_parts[0])
+            for j in range(1, len(sub_parts), 2):
+                label = sub_parts[j]
+                body = sub_parts[j + 1] if j + 1 < len(sub_parts) else ""
+                para.sub_paragraphs.append(
+                    SubParagraph(label=label, text=self._clean_whitespace(body))
+                )
+
+
+class DocumentTextStream:
+    """Parse one document from its pages as they are extracted.
+
+    ``feed`` takes the pages in order; ``close`` returns the DocumentItem,
+    the same as ``FinalActsParser._parse_document_text`` gives for the
+    pages joined by newlines. Each page is normalised up to its last
+    character before trailing whitespace (NORMALIZE_PENDING_RE), the rest
+    waits for the next page. Until the enacting formula is complete the
+    text is kept whole; after it, ANNEX_HEADING_RE and SECTION_KEYWORD_RE
+    resume where they stopped on the previous page. A section goes to
+    ``_parse_preamble_section``/``_parse_operative_section`` as soon as
+    the next keyword line (or the first annex heading, or the end of the
+    document) closes it, and its text is dropped; an annex is stored once
+    the next annex heading is complete.
+
+    Positions are offsets into the body, the text after the enacting
+    formula; ``_body`` holds the body from ``_base`` on.
+    """
+
+    def __init__(self, parser: "FinalActsParser", entry: dict):
+        self.parser = parser
+        self.doc = parser._header_item(entry)
+        self._pages = 0
+        self._raw = ""          # trailing whitespace not normalised yet
+        self._head = ""         # normalised text while the enacting formula is open; None after
+        self._body = ""
+        self._base = 0
+        self._scan = 0          # where SECTION_KEYWORD_RE resumes
+        self._line = 0          # start of the first line not yet checked for an annex heading
+        self._body_end = None   # start of the first annex heading, once found
+        self._open = None       # (start, keyword end, keyword, type) of the last section
+        self._keyword_ends = {}  # keyword -> end of its last match
+        self._keyword_hits = 0
+        self._annex = ""        # text from the current annex heading on
+        self._annex_line = 0    # as _line, in _annex
+        self._annex_hits = 0
+
+    def feed(self, page_text: str):
+        """Add the next page of the document."""
+        self._raw += f"\n{page_text}" if self._pages else page_text
+        self._pages += 1
+        cut = NORMALIZE_PENDING_RE.search(self._raw).start()
+        if not cut:
+            return
+        text = self.parser._normalize_text(self._raw[:cut], False)
+        self._raw = self._raw[cut:]
+        if self._head is not None:
+            self._head += text if self._head else text.lstrip()
+            self._find_formula(final=False)
+        elif self._body_end is None:
+            self._body += text
+            self._advance(final=False)
+        else:
+            self._annex += text
+            self._advance(final=False)
+
+    def close(self) -> DocumentItem:
+        """Parse what is left and return the document.
+
+        The raw text still pending is whitespace, which the final strip of
+        ``_normalize_text`` would drop.
+        """
+        if self._head is not None:
+            self._find_formula(final=True)
+        else:
+            self._advance(final=True)
+        if self._open is not None:
+            self._close_section(self._base + len(self._body))
+        if self._body_end is not None:
+            self.doc.annexes.append(self._annex.strip())
+        self.parser._count_matches("ANNEX_HEADING_RE", self._annex_hits)
+        self.parser._count_matches("SECTION_KEYWORD_RE", self._keyword_hits)
+        return self.doc
+
+    def _find_formula(self, final: bool):
+        """Look for the enacting formula; the body starts after it, or at the start without one.
+
+        A match can still grow while it ends the text on ")": a "," may follow.
+        """
+        head = self._head
+        m = self.parser.enacting_formula_re.search(head)
+        if m and not final and m.end() == len(head) and head[-1] != ",":
+            return
+        if m is None and not final:
+            return
+        self.parser._count_matches("enacting_formula_re", int(m is not None))
+        if m:
+            self.doc.enacting_formula = self.parser._clean_whitespace(m.group(1))
+        self._head = None
+        self._body = head[m.end():] if m else head
+        self._advance(final)
+
+    def _advance(self, final: bool):
+        """Scan the text added since the last call for annex headings and keywords."""
+        if self._body_end is None:
+            self._find_body_end(final)
+        self._find_sections()
+        if self._body_end is not None:
+            self._find_annexes(final)
+
+    def _find_body_end(self, final: bool):
+        """Look for the first annex heading; the text from there on is annex text."""
+        body = self._body
+        m = ANNEX_HEADING_RE.search(body, self._line - self._base)
+        if m and (final or m.end() < len(body)):
+            self._body_end = self._base + m.start(1)
+            self._body = body[:m.start(1)]
+            self._annex = body[m.start(1):]
+            self._annex_line = m.end() - m.start(1)
+            self._annex_hits = 1
+            return
+        newline = body.rfind("\n", self._line - self._base)
+        if newline >= 0:
+            self._line = self._base + newline + 1
+
+    def _find_sections(self):
+        """Handle the keyword lines between the last one and the end of the body text so far."""
+        text, base = self._body, self._base
+        end = len(text)
+        for m in SECTION_KEYWORD_RE.finditer(text, self._scan - base):
+            self._keyword_hits += 1
+            self._scan = base + m.end()
+            kw, kw_type = SECTION_KEYWORD_TYPES[m.group(1).lower()]
+
+            # A keyword repeated on the very next non-blank line counts once.
+            # The blank-line run after a keyword match before _base ended
+            # before the keyword of the open section.
+            last_end = self._keyword_ends.get(kw)
+            if (last_end is not None and last_end >= base
+                    and m.start() < KEYWORD_LINE_END_RE.match(text, last_end - base).end()):
+                continue
+            self._keyword_ends[kw] = base + m.end()
+
+            # Remove overlapping matches (keep earlier)
+            start = base + m.start()
+            if self._open and start <= self._open[0] + len(self._open[2]) + 5:
+                continue
+            if self._open:
+                self._close_section(start)
+            self._open = (start, base + m.end(), kw, kw_type)
+
+        # Only the open section's text is still needed
+        if self._open and self._open[0] > base:
+            self._body = text[self._open[0] - base:]
+            self._base = self._open[0]
+
+    def _close_section(self, end: int):
+        """Parse the last section, which runs to ``end``."""
+        start, kw_end, kw, kw_type = self._open
+        section_text = self._body[kw_end - self._base:end - self._base].strip()
+        if kw_type == "preamble":
+            self.doc.preamble_sections.append(self.parser._parse_preamble_section(kw, section_text))
+        else:
+            self.doc.operative_sections.append(self.parser._parse_operative_section(kw, section_text))
+
+    def _find_annexes(self, final: bool):
+        """Store each annex whose next annex heading is complete."""
+        while True:
+            m = ANNEX_HEADING_RE.search(self._annex, self._annex_line)
+            if not m or not (final or m.end() < len(self._annex)):
+                break
+            self.doc.annexes.append(self._annex[:m.start(1)].strip())
+            self._annex = self._annex[m.start(1):]
+            self._annex_line = m.end() - m.start(1)
+            self._annex_hits += 1
+        newline = self._annex.rfind("\n", self._annex_line)
+        if newline >= 0:
+            self._annex_line = newline + 1
+
+
+def _parse_document_shard(pdf_path: str, shard: list,
+                          cache_path: Optional[str] = None,
+                          pdf_sha256: Optional[str] = None,
+                          collect_metrics: bool = False,
+                          manifest: Optional[dict] = None,
+                          layout: bool = False,
+                          conference: Optional[dict] = None) -> tuple:
+    """Process-pool entry point: parse a shard of (entry, end_page) ranges.
+
+    PyMuPDF documents and SQLite connections cannot be shared between
+    processes, so each worker opens its own handles on the PDF and cache.
+    Returns the (doc_item, fingerprint) results and, if requested, the
+    worker's metrics dict.
+    """
+    cache = PageTextCache(cache_path) if cache_path else None
+    extractor = PDFExtractor(pdf_path, cache=cache, pdf_sha256=pdf_sha256, layout=layout)
+    metrics = ConversionMetrics() if collect_metrics else None
+    try:
+        doc_parser = FinalActsParser(extractor, metrics=metrics, conference=conference)
+        results = [doc_parser._parse_entry(entry, end_page, manifest) for entry, end_page in shard]
+        return results, (metrics.to_dict() if metrics is not None else None)
+    finally:
+        extractor.close()
+        if cache is not None:
+            cache.close()
+
+
+# ---------------------------------------------------------------------------
+# Cross-references
+# ---------------------------------------------------------------------------
+
+def document_work_iri(doc_type: str, number: str, conference_date: str = "2018-11-15",
+                      body: str = "itu-pp") -> str:
+    """FRBR work IRI of a resolution/decision/recommendation."""
+    num_slug = number.replace("/", "-").replace(" ", "_")
+    doc_prefix = doc_type.lower()[:3]
+    return f"/akn/un/statement/deliberation/{body}/{conference_date}/{doc_prefix}-{num_slug}"
+
+
+class ReferenceIndex:
+    """Known work IRIs, looked up by REFERENCE_RE matches.
+
+    Documents are keyed by (type, number, location, year), so a reference
+    to "Resolution 71 (Rev. Busan, 2014)" resolves to the Busan version
+    only if that conference's Final Acts were added too. A reference
+    without a revision resolves to the version adopted at the conference
+    of the document containing it.
+    """
+
+    def __init__(self):
+        self.works = {}  # (DOC_TYPE, number, location, year) -> work IRI
+
+    @classmethod
+    def from_final_acts(cls, *final_acts: FinalActs) -> "ReferenceIndex":
+        index = cls()
+        for acts in final_acts:
+            index.add_final_acts(acts)
+        return index
+
+    def add_final_acts(self, acts: FinalActs):
+        for docs in acts.parts.values():
+            for doc_item in docs:
+                self.add(doc_item.doc_type, doc_item.number, acts.location, acts.year,
+                         document_work_iri(doc_item.doc_type, doc_item.number,
+                                           acts.conference_date, acts.body))
+
+    def add(self, doc_type: str, number: str, location: str, year: str, iri: str):
+        self.works[(doc_type.upper(), number, location.lower(), year)] = iri
+
+    def resolve(self, m: "re.Match", location: str, year: str) -> Optional[str]:
+        """href for a REFERENCE_RE match, or None if the target is unknown.
+
+        ``location`` and ``year`` are those of the citing conference.
+        """
+        if m.group("instrument"):
+            prefix = PROVISION_EID_PREFIX[m.group("provision")]
+            return f"{INSTRUMENT_IRIS[m.group('instrument')]}#{prefix}_{m.group('provision_number')}"
+        location = (m.group("location") or location).strip().lower()
+        year = m.group("year") or year
+        return self.works.get((m.group("doc_type").upper(), m.group("number"), location, year))
+
+
+# ---------------------------------------------------------------------------
+# Version diff
+# ---------------------------------------------------------------------------
+
+def _keyword_eid(text: str) -> str:
+    """Lower-case eId fragment of a keyword or part name."""
+    eid = EID_INVALID_RE.sub("_", text.lower())
+    eid = EID_UNDERSCORES_RE.sub("_", eid).strip("_")
+    return eid[:50]
+
+
+def _unique_eid(eid: str, seen: dict) -> str:
+    """``eid``, or ``eid_2``, ``eid_3`` ... when ``seen`` shows it was already used."""
+    n = seen[eid] = seen.get(eid, 0) + 1
+    return eid if n == 1 else f"{eid}_{n}"
+
+
+def preamble_eids(doc_item: DocumentItem) -> list:
+    """eId of the <recitals> of each preamble section, in document order."""
+    seen = {}
+    return [_unique_eid(f"recs_{_keyword_eid(sec.keyword)}", seen)
+            for sec in doc_item.preamble_sections]
+
+
+def operative_eids(doc_item: DocumentItem) -> list:
+    """eIds of the operative part, as AKNGenerator assigns them.
+
+    One (hcontainer eId, [(paragraph eId, [point eIds])]) per operative
+    section. Paragraph numbering restarts in each section, so paragraph
+    and point eIds are qualified with the hcontainer's
+    (``hcont_resolves__para_1__point_a``); a keyword used for two sections
+    gets a numbered hcontainer (``hcont_resolves_2``).
+    """
+    seen = {}
+    sections = []
+    para_counter = 0
+    for sec in doc_item.operative_sections:
+        hcont_eid = _unique_eid(f"hcont_{_keyword_eid(sec.keyword)}", seen)
+        paragraphs = []
+        for para in sec.paragraphs:
+            para_counter += 1
+            if not para.num:
+                paragraphs.append((f"para_unnumbered_{para_counter}", []))
+                continue
+            para_eid = _unique_eid(f"{hcont_eid}__para_{para.num}", seen)
+            points = [
+                _unique_eid(f"{para_eid}__point_{sp.label.replace(')', '').replace('.', '-')}", seen)
+                for sp in para.sub_paragraphs
+            ]
+            paragraphs.append((para_eid, points))
+        sections.append((hcont_eid, paragraphs))
+    return sections
+
+
+def document_units(doc_item: DocumentItem) -> list:
+    """(eId, text) of every recital, paragraph and point, in document order.
+
+    The eIds are the ones AKNGenerator assigns, unique within the document.
+    """
+    units = []
+    recital_counter = 0
+    for sec in doc_item.preamble_sections:
+        for para in sec.paragraphs:
+            recital_counter += 1
+            units.append((f"rec_{recital_counter}", para.text))
+    for sec, (_, paragraphs) in zip(doc_item.operative_sections, operative_eids(doc_item)):
+        for para, (para_eid, point_eids) in zip(sec.paragraphs, paragraphs):
+            units.append((para_eid, para.text))
+            units.extend((point_eid, sp.text) for sp, point_eid in zip(para.sub_paragraphs, point_eids))
+    return units
+
+
+def _unit_hashes(units: list) -> list:
+    return [hash(" ".join(text.split())) for _, text in units]
+
+
+def _myers_pairs(a: list, b: list) -> list:
+    """Index pairs (i, j) of a longest common subsequence of ``a`` and ``b``.
+
+    Myers' O((N+M)D) algorithm: cheap when two versions differ in few
+    units, which is the common case along a version chain.
+    """
+    n, m = len(a), len(b)
+    if not n or not m:
+        return []
+    offset = n + m
+    v = [0] * (2 * offset + 2)
+    trace = []
+    for d in range(offset + 1):
+        trace.append(v[:])
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+                x = v[offset + k + 1]
+            else:
+                x = v[offset + k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[x] == b[y]:
+                x += 1
+                y += 1
+            v[offset + k] = x
+            if x >= n and y >= m:
+                break
+        else:
+            continue
+        break
+
+    pairs = []
+    x, y = n, m
+    for d in range(len(trace) - 1, -1, -1):
+        v = trace[d]
+        k = x - y
+        if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+            prev_k = k + 1
+        else:
+            prev_k = k - 1
+        prev_x = v[offset + prev_k]
+        prev_y = prev_x - prev_k
+        while x > prev_x and y > prev_y:
+            x -= 1
+            y -= 1
+            pairs.append((x, y))
+        if d > 0:
+            x, y = prev_x, prev_y
+    pairs.reverse()
+    return pairs
+
+
+def diff_units(old_hashes: list, new_hashes: list) -> list:
+    """Align two unit sequences by hash; return (op, old_index, new_index).
+
+    ``op`` is "substitution", "insertion" (old_index None) or "repeal"
+    (new_index None). Within a gap between aligned units, deleted and
+    inserted units are paired in order as substitutions; texts are never
+    compared directly.
+    """
+    n, m = len(old_hashes), len(new_hashes)
+    prefix = 0
+    while prefix < min(n, m) and old_hashes[prefix] == new_hashes[prefix]:
+        prefix += 1
+    suffix = 0
+    while (suffix < min(n, m) - prefix
+           and old_hashes[n - 1 - suffix] == new_hashes[m - 1 - suffix]):
+        suffix += 1
+
+    middle = _myers_pairs(old_hashes[prefix:n - suffix], new_hashes[prefix:m - suffix])
+    anchors = [(prefix + i, prefix + j) for i, j in middle] + [(n - suffix, m - suffix)]
+
+    ops = []
+    i, j = prefix, prefix
+    for next_i, next_j in anchors:
+        deleted, inserted = range(i, next_i), range(j, next_j)
+        paired = min(len(deleted), len(inserted))
+        ops.extend(("substitution", deleted[k], inserted[k]) for k in range(paired))
+        ops.extend(("repeal", d, None) for d in deleted[paired:])
+        ops.extend(("insertion", None, ins) for ins in inserted[paired:])
+        i, j = next_i + 1, next_j + 1
+    return ops
+
+
+def diff_documents(old: DocumentItem, new: DocumentItem,
+                   old_acts: FinalActs, new_acts: FinalActs) -> list:
+    """TextualMod records turning ``old`` (in ``old_acts``) into ``new``."""
+    old_units, new_units = document_units(old), document_units(new)
+    old_expr = (f"{document_work_iri(old.doc_type, old.number, old_acts.conference_date, old_acts.body)}"
+                f"/eng@{old_acts.conference_date}")
+    source = new_acts.collection_work_iri
+
+    mods = []
+    for op, i, j in diff_units(_unit_hashes(old_units), _unit_hashes(new_units)):
+        old_href = f"{old_expr}#{old_units[i][0]}" if i is not None else ""
+        new_href = f"#{new_units[j][0]}" if j is not None else ""
+        mods.append(TextualMod(type=op, source=source, destination=new_href or old_href,
+                               old=old_href, new=new_href))
+    return mods
+
+
+def link_version_chains(all_acts: list) -> int:
+    """Diff every document against its previous version in ``all_acts``.
+
+    Versions of a document (same adopting body, type and number, so that
+    WTSA Resolution 1 is not a revision of PP Resolution 1) are ordered by
+    conference date and each is compared with its predecessor only, so a chain of K
+    conferences costs K - 1 diffs. Sets ``DocumentItem.modifications`` and
+    returns the number of documents with a previous version.
+    """
+    chains = {}
+    for acts in sorted(all_acts, key=lambda a: a.conference_date):
+        for docs in acts.parts.values():
+            for doc_item in docs:
+                chains.setdefault((acts.body, doc_item.doc_type, doc_item.number), []).append((acts, doc_item))
+
+    linked = 0
+    for versions in chains.values():
+        for (old_acts, old), (new_acts, new) in zip(versions, versions[1:]):
+            new.modifications = diff_documents(old, new, old_acts, new_acts)
+            linked += 1
+    return linked
+
+
+# ---------------------------------------------------------------------------
+# AKN4UN XML Generator
+# ---------------------------------------------------------------------------
+
+class AKNGenerator:
+    """Generates AKN4UN XML from parsed document structures."""
+
+    def __init__(self, final_acts: FinalActs, metrics: Optional[ConversionMetrics] = None,
+                 previous_dir: Optional[str] = None,
+                 references: Optional[ReferenceIndex] = None):
+        self.acts = final_acts
+        self.today = date.today().isoformat()
+        self.metrics = metrics
+        self.previous_dir = previous_dir  # individual XML files of a previous run
+        # Shared across conferences in batch mode so earlier revisions resolve
+        self.references = references or ReferenceIndex.from_final_acts(final_acts)
+        self._notes = {}       # marker -> unused Footnotes of the current document
+        self._note_count = 0   # authorialNote eId counter of the current document
+        self._reference_hits = 0  # REFERENCE_RE matches in the current document
+
+    def _el(self, tag: str, parent=None, text=None, **attribs) -> etree._Element:
+        """Create an AKN element."""
+        el = etree.SubElement(parent, f"{{{AKN_NS}}}{tag}") if parent is not None else etree.Element(f"{{{AKN_NS}}}{tag}", nsmap=NSMAP)
+        for k, v in attribs.items():
+            if k == "xml_lang":
+                el.set(f"{{{XML_NS}}}lang", v)
+            elif k == "eId":
+                el.set("eId", v)
+            elif k == "wId":
+                el.set("wId", v)
+            else:
+                el.set(k.replace("_", ""), v)
+        if text:
+            el.text = _sanitize_xml_text(text)
+        return el
+
+    def generate_collection(self) -> etree._Element:
+        """Generate the top-level documentCollection for the entire Final Acts."""
+        root = self._el("akomaNtoso")
+        doc_collection = self.generate_collection_header()
+        root.append(doc_collection)
+
+        self._add_components_section(doc_collection)
+
+        return root
+
+    def generate_collection_header(self) -> etree._Element:
+        """Generate the documentCollection with meta, preface and collectionBody only.
+
+        The per-document <components> are left out so that callers can
+        either append them (generate_collection) or stream them to disk
+        (write_collection).
+        """
+        doc_collection = self._el("documentCollection", name="finalActs")
+        doc_collection.set(f"{{{XML_NS}}}lang", "en")
+
+        self._add_collection_meta(doc_collection)
+        self._add_collection_preface(doc_collection)
+
+        coll_body = self._el("collectionBody", doc_collection)
+
+        for part_name, documents in self.acts.parts.items():
+            part_eid = self._make_eid(part_name)
+            part_el = self._el("component", coll_body, eId=f"cmp_{part_eid}")
+            self._el("componentRef",
+                      part_el,
+                      src=f"#cmp_{part_eid}",
+                      showAs=part_name)
+
+        return doc_collection
+
+    def iter_components(self, include_unchanged: bool = True):
+        """Yield (document eId, statement element) for each document in order.
+
+        Documents in ``FinalActs.unchanged`` are not regenerated: their
+        statement is read back from ``previous_dir``, or skipped entirely
+        when ``include_unchanged`` is False.
+        """
+        for part_name, documents in self.acts.parts.items():
+            for doc_item in documents:
+                doc_eid = self._doc_eid(doc_item)
+                if doc_eid in self.acts.unchanged:
+                    if not include_unchanged:
+                        continue
+                    doc_xml = self._load_previous_document(doc_eid)
+                else:
+                    with _stage(self.metrics, "xml_generation", doc_eid):
+                        doc_xml = self._generate_single_document(doc_item)
+                yield doc_eid, doc_xml
+
+    def _load_previous_document(self, doc_eid: str) -> etree._Element:
+        """Read an unchanged document's <statement> from the previous run."""
+        path = os.path.join(self.previous_dir, f"{doc_eid}.xml")
+        parser = etree.XMLParser(remove_blank_text=True)
+        return etree.parse(path, parser).getroot()[0]
+
+    def _add_collection_meta(self, parent):
+        """Add metadata block for the collection."""
+        meta = self._el("meta", parent)
+        ident = self._el("identification", meta, source="#itu")
+
+        acts = self.acts
+        date_ = acts.conference_date
+        work_iri_base = acts.collection_work_iri
+
+        work = self._el("FRBRWork", ident)
+        self._el("FRBRthis", work, value=f"{work_iri_base}/!main")
+        self._el("FRBRuri", work, value=work_iri_base)
+        self._el("FRBRdate", work, date=date_, name="publication")
+        self._el("FRBRauthor", work, href=f"#{acts.body}")
+        self._el("FRBRcountry", work, value="un")
+        self._el("FRBRsubtype", work, value="publication")
+        self._el("FRBRnumber", work, value=f"{acts.slug}-final-acts", showAs=f"Final Acts {acts.abbreviation}")
+
+        expr = self._el("FRBRExpression", ident)
+        self._el("FRBRthis", expr, value=f"{work_iri_base}/eng@{date_}/!main")
+        self._el("FRBRuri", expr, value=f"{work_iri_base}/eng@{date_}")
+        self._el("FRBRdate", expr, date=date_, name="publication")
+        self._el("FRBRauthor", expr, href=f"#{acts.body}")
+        self._el("FRBRlanguage", expr, language="eng")
+
+        manif = self._el("FRBRManifestation", ident)
+        self._el("FRBRthis", manif, value=f"{work_iri_base}/eng@{date_}/.xml")
+        self._el("FRBRuri", manif, value=f"{work_iri_base}/eng@{date_}/.xml")
+        self._el("FRBRdate", manif, date=self.today, name="XMLMarkup")
+        self._el("FRBRauthor", manif, href="#converter")
+
+        refs = self._el("references", meta, source="#converter")
+        self._el("TLCOrganization",
+                 refs,
+                 eId="itu",
+                 href="/ontology/organizations/itu",
+                 showAs="International Telecommunication Union")
+        self._el("TLCOrganization",
+                 refs,
+                 eId=acts.body,
+                 href=f"/ontology/organizations/{acts.body}",
+                 showAs=f"ITU {acts.conference} ({acts.location}, {acts.year})")
+        self._el("TLCOrganization",
+                 refs,
+                 eId="converter",
+                 href="/ontology/software/akn4itu-converter",
+                 showAs="AKN4ITU PDF Converter")
+
+    def _add_collection_preface(self, parent):
+        """Add preface block for the collection."""
+        preface = self._el("preface", parent)
+        long_title = self._el("longTitle", preface)
+        p = self._el("p", long_title)
+        doc_type = self._el("docType", p, text="FINAL ACTS")
+        p_text = self._el("docTitle", p,
+                          text=f"of the {self.acts.conference} ({self.acts.location}, {self.acts.year})")
+
+    def _add_components_section(self, doc_collection):
+        """Add the <components> section with each individual document."""
+        components = self._el("components", doc_collection)
+
+        for doc_eid, doc_xml in self.iter_components():
+            comp_el = self._el("component", components, eId=f"cmp_{doc_eid}")
+            comp_el.append(doc_xml)
+
+    def _generate_single_document(self, doc_item: DocumentItem) -> etree._Element:
+        """Generate AKN4UN XML for a single Resolution/Decision/Recommendation."""
+        doc_type_akn = "statement"
+        subtype = "deliberation"
+        name = doc_item.doc_type.lower()
+
+        statement = self._el(doc_type_akn, name=name)
+        statement.set(f"{{{XML_NS}}}lang", "en")
+
+        self._notes = {}
+        self._note_count = 0
+        self._reference_hits = 0
+        for note in doc_item.footnotes:
+            self._notes.setdefault(note.marker, []).append(note)
+        self._tables = doc_item.tables
+        self._placed_tables = set()
+
+        self._add_document_meta(statement, doc_item)
+        self._add_document_preface(statement, doc_item)
+
+        if doc_item.preamble_sections:
+            self._add_document_preamble(statement, doc_item)
+
+        main_body = self._add_document_body(statement, doc_item)
+
+        if doc_item.annexes:
+            self._add_document_attachments(statement, doc_item)
+
+        # Tables whose TABLE_REF did not end up in any text
+        for i, table in enumerate(doc_item.tables):
+            if i not in self._placed_tables:
+                self._add_table(main_body, table, f"table_{i + 1}")
+
+        if self.metrics is not None:
+            matches = self.metrics.document(self._doc_eid(doc_item)).setdefault("matches", {})
+            matches["REFERENCE_RE"] = self._reference_hits
+        return statement
+
+    def _add_document_meta(self, parent, doc_item: DocumentItem):
+        """Add FRBR metadata for a single document."""
+        meta = self._el("meta", parent)
+        self._add_identification(meta, doc_item)
+
+        if doc_item.modifications:
+            self._add_passive_modifications(meta, doc_item)
+
+        acts = self.acts
+        refs = self._el("references", meta, source="#converter")
+        self._el("TLCOrganization",
+                 refs,
+                 eId="itu",
+                 href="/ontology/organizations/itu",
+                 showAs="International Telecommunication Union")
+        self._el("TLCOrganization",
+                 refs,
+                 eId=acts.body,
+                 href=f"/ontology/organizations/{acts.body}",
+                 showAs=f"ITU {acts.conference}")
+
+    def _add_identification(self, meta, doc_item: DocumentItem, component: str = "main"):
+        """Add the FRBR <identification> of a document, or of one of its annexes."""
+        ident = self._el("identification", meta, source="#itu")
+
+        num_slug = doc_item.number.replace("/", "-").replace(" ", "_")
+        doc_prefix = doc_item.doc_type.lower()[:3]
+        acts = self.acts
+        date_ = acts.conference_date
+        work_iri = document_work_iri(doc_item.doc_type, doc_item.number, date_, acts.body)
+        manif_this = f"{work_iri}/eng@{date_}/.xml" if component == "main" else \
+            f"{work_iri}/eng@{date_}/!{component}.xml"
+
+        work = self._el("FRBRWork", ident)
+        self._el("FRBRthis", work, value=f"{work_iri}/!{component}")
+        self._el("FRBRuri", work, value=work_iri)
+        self._el("FRBRdate", work, date=date_, name="adoption")
+        self._el("FRBRauthor", work, href=f"#{acts.body}")
+        self._el("FRBRcountry", work, value="un")
+        self._el("FRBRsubtype", work, value="deliberation")
+        num_el = self._el("FRBRnumber", work, value=f"{doc_prefix}-{num_slug}")
+        num_el.set("showAs", f"{doc_item.doc_type} {doc_item.number} ({doc_item.revision})")
+
+        expr = self._el("FRBRExpression", ident)
+        self._el("FRBRthis", expr, value=f"{work_iri}/eng@{date_}/!{component}")
+        self._el("FRBRuri", expr, value=f"{work_iri}/eng@{date_}")
+        self._el("FRBRdate", expr, date=date_, name="adoption")
+        self._el("FRBRauthor", expr, href=f"#{acts.body}")
+        self._el("FRBRlanguage", expr, language="eng")
+
+        manif = self._el("FRBRManifestation", ident)
+        self._el("FRBRthis", manif, value=manif_this)
+        self._el("FRBRuri", manif, value=f"{work_iri}/eng@{date_}/.xml")
+        self._el("FRBRdate", manif, date=self.today, name="XMLMarkup")
+        self._el("FRBRauthor", manif, href="#converter")
+
+    def _add_passive_modifications(self, meta, doc_item: DocumentItem):
+        """Add <analysis><passiveModifications> from the version diff."""
+        analysis = self._el("analysis", meta, source="#converter")
+        passive = self._el("passiveModifications", analysis)
+        for i, mod in enumerate(doc_item.modifications, 1):
+            text_mod = self._el("textualMod", passive, type=mod.type, eId=f"pmod_{i}")
+            self._el("source", text_mod, href=mod.source)
+            self._el("destination", text_mod, href=mod.destination)
+            if mod.old:
+                self._el("old", text_mod, href=mod.old)
+            if mod.new:
+                self._el("new", text_mod, href=mod.new)
+
+    def _add_document_preface(self, parent, doc_item: DocumentItem):
+        """Add the identification/title block."""
+        preface = self._el("preface", parent)
+        long_title = self._el("longTitle", preface, eId="longTitle_1")
+        p = self._el("p", long_title)
+
+        self._el("docType", p, text=doc_item.doc_type)
+        self._el("docNumber", p, text=f"{doc_item.number} ({doc_item.revision})")
+
+        title_block = self._el("container", preface, name="title", eId="container_title")
+        self._el("p", title_block, text=doc_item.title)
+
+    def _add_document_preamble(self, parent, doc_item: DocumentItem):
+        """Add the preamble with recitals/considering clauses."""
+        preamble = self._el("preamble", parent, eId="preamble")
+
+        if doc_item.enacting_formula:
+            formula = self._el("formula", preamble, name="enactingFormula", eId="formula_1")
+            self._blocks(formula, doc_item.enacting_formula)
+
+        recital_counter = 0
+        for sec, recitals_eid in zip(doc_item.preamble_sections, preamble_eids(doc_item)):
+            recitals = self._el("recitals", preamble, eId=recitals_eid)
+
+            intro = self._el("intro", recitals)
+            p_intro = self._el("p", intro)
+            i_el = etree.SubElement(p_intro, f"{{{AKN_NS}}}i")
+            i_el.text = sec.keyword
+
+            for para in sec.paragraphs:
+                recital_counter += 1
+                rec_eid = f"rec_{recital_counter}"
+
+                if para.label:
+                    recital = self._el("recital", recitals, eId=rec_eid)
+                    self._el("num", recital, text=para.label)
+                    self._blocks(recital, para.text)
+                else:
+                    recital = self._el("recital", recitals, eId=rec_eid)
+                    self._blocks(recital, para.text)
+
+    def _add_document_body(self, parent, doc_item: DocumentItem):
+        """Add the main body with operative sections."""
+        main_body = self._el("mainBody", parent, eId="body")
+
+        for sec, (hcont_eid, paragraphs) in zip(doc_item.operative_sections, operative_eids(doc_item)):
+            section = self._el("hcontainer", main_body, name=self._make_eid(sec.keyword), eId=hcont_eid)
+
+            heading = self._el("heading", section)
+            i_el = etree.SubElement(heading, f"{{{AKN_NS}}}i")
+            i_el.text = sec.keyword
+
+            for para, (para_eid, point_eids) in zip(sec.paragraphs, paragraphs):
+                if para.num:
+                    para_el = self._el("paragraph", section, eId=para_eid)
+                    self._el("num", para_el, text=para.num)
+
+                    if para.sub_paragraphs:
+                        content = self._el("content", para_el)
+                        if para.text:
+                            self._blocks(content, para.text)
+                        lst = self._el("list", para_el, eId=f"{para_eid}__list_1")
+
+                        for sp, point_eid in zip(para.sub_paragraphs, point_eids):
+                            point = self._el("point", lst, eId=point_eid)
+                            self._el("num", point, text=sp.label)
+                            content_sp = self._el("content", point)
+                            self._blocks(content_sp, sp.text)
+                    else:
+                        content = self._el("content", para_el)
+                        self._blocks(content, para.text)
+                else:
+                    block = self._el("paragraph", section, eId=para_eid)
+                    content = self._el("content", block)
+                    self._blocks(content, para.text)
+        return main_body
+
+    def _blocks(self, parent, text: str):
+        """Add ``text`` as <p> blocks, with the <table> of each TABLE_REF at its place.
+
+        A TABLE_REF whose table is missing or already written is dropped.
+        """
+        if TABLE_REF_START not in text:
+            self._p(parent, text)
+            return
+        pieces = TABLE_REF_RE.split(text)
+        for j, piece in enumerate(pieces):
+            if j % 2 == 0:
+                if piece.strip():
+                    self._p(parent, piece.strip())
+                continue
+            i = int(piece)
+            if i < len(self._tables) and i not in self._placed_tables:
+                self._placed_tables.add(i)
+                self._add_table(parent, self._tables[i], f"table_{i + 1}")
+
+    def _add_table(self, parent, table: Table, eid: str) -> etree._Element:
+        """Add a <table> with one <tr> per row and one <td> per cell."""
+        table_el = self._el("table", parent, eId=eid)
+        for row in table.rows:
+            tr = self._el("tr", table_el)
+            for cell in row:
+                td = self._el("td", tr)
+                if cell:
+                    self._p(td, cell)
+        return table_el
+
+    def _p(self, parent, text: str) -> etree._Element:
+        """Add a <p>, tagging cross-references and footnote markers inline.
+
+        References that resolve against ``self.references`` become <ref href>.
+        Each footnote marker takes the first unused footnote with the same
+        marker in the document and becomes an <authorialNote>; markers
+        without a footnote are kept as plain text.
+        """
+        p = self._el("p", parent)
+        pieces = NOTE_REF_RE.split(text) if NOTE_REF_START in text else [text]
+        self._add_inline_text(p, pieces[0])
+        for j in range(1, len(pieces), 2):
+            marker = pieces[j]
+            queue = self._notes.get(marker)
+            if queue:
+                note = queue.pop(0)
+                self._note_count += 1
+                note_el = self._el("authorialNote", p, marker=marker, placement="bottom",
+                                   eId=f"authorialNote_{self._note_count}")
+                self._el("p", note_el, text=note.text)
+            else:
+                self._append_text(p, marker)
+            self._add_inline_text(p, pieces[j + 1])
+        return p
+
+    def _add_inline_text(self, p, text: str):
+        """Append text to ``p``, wrapping resolvable references in <ref>."""
+        pos = 0
+        for m in REFERENCE_RE.finditer(text):
+            self._reference_hits += 1
+            href = self.references.resolve(m, self.acts.location, self.acts.year)
+            if href is None:
+                continue
+            self._append_text(p, text[pos:m.start()])
+            self._el("ref", p, text=m.group(0), href=href)
+            pos = m.end()
+        self._append_text(p, text[pos:])
+
+    @staticmethod
+    def _append_text(p, text: str):
+        """Append text after the last child of ``p`` (or as its text)."""
+        text = _sanitize_xml_text(text)
+        if not text:
+            return
+        if len(p):
+            p[-1].tail = (p[-1].tail or "") + text
+        else:
+            p.text = (p.text or "") + text
+
+    def _add_document_attachments(self, parent, doc_item: DocumentItem):
+        """Add annexes/attachments if present, headed by their heading line."""
+        attachments = self._el("attachments", parent)
+        for i, annex_text in enumerate(doc_item.annexes, 1):
+            heading_text, _, annex_body = annex_text.partition("\n")
+            att = self._el("attachment", attachments, eId=f"att_{i}")
+            heading = self._el("heading", att, text=heading_text.strip() or f"Annex {i}")
+            doc_el = self._el("doc", att, name="annex")
+            self._add_identification(self._el("meta", doc_el), doc_item, f"annex_{i}")
+            main_body = self._el("mainBody", doc_el)
+            for block in annex_body.split("\n\n"):
+                if block.strip():
+                    self._blocks(main_body, WHITESPACE_RE.sub(" ", block).strip())
+
+    def _make_eid(self, text: str) -> str:
+        """Convert text to a valid eId."""
+        return _keyword_eid(text)
+
+    def _doc_eid(self, doc_item: DocumentItem) -> str:
+        """Create eId for a document item."""
+        prefix = doc_item.doc_type.lower()[:3]
+        return f"{prefix}_{doc_item.number}"
+
+
+# ---------------------------------------------------------------------------
+# XML Writer
+# ---------------------------------------------------------------------------
+
+def write_xml(root: etree._Element, output_path: str):
+    """Write the XML tree to file with proper formatting."""
+    tree = etree.ElementTree(root)
+    etree.indent(tree, space="  ")
+    with open(output_path, "wb") as f:
+        tree.write(
+            f,
+            xml_declaration=True,
+            encoding="UTF-8",
+            pretty_print=True,
+        )
+    print(f"Written: {output_path}")
+
+
+# The enclosing <akomaNtoso> already declares the AKN default namespace
+_AKN_XMLNS = f' xmlns="{AKN_NS}"'.encode("ascii")
+
+
+def _write_indented(xf, f, element: etree._Element, level: int):
+    """Write one subtree to an xmlfile, indented as if at the given depth.
+
+    xmlfile.write() re-declares the default namespace on every subtree, so
+    the subtree is serialised here and written to ``f`` without it.
+    """
+    etree.indent(element, space="  ", level=level)
+    xf.write("\n" + "  " * level)
+    xf.flush()
+    f.write(etree.tostring(element, encoding="UTF-8", with_tail=False).replace(_AKN_XMLNS, b"", 1))
+
+
+def write_collection(generator: "AKNGenerator", output_path: str, components=None):
+    """Stream the documentCollection to file one component at a time.
+
+    Produces the same layout as ``write_xml(generator.generate_collection())``
+    but only the collection header and the statement currently being written
+    are held in memory.
+
+    ``components`` yields (document eId, statement element) pairs and
+    defaults to ``generator.iter_components()``.
+    """
+    if components is None:
+        components = generator.iter_components()
+    header = generator.generate_collection_header()
+    # xmlfile mis-prefixes Clark-notation xml:* attributes on streamed start tags
+    header_attrib = {k.replace(f"{{{XML_NS}}}", "xml:"): v for k, v in header.attrib.items()}
+    with open(output_path, "wb") as f:
+        with etree.xmlfile(f, encoding="UTF-8") as xf:
+            xf.write_declaration()
+            with xf.element(f"{{{AKN_NS}}}akomaNtoso", nsmap=NSMAP):
+                xf.write("\n  ")
+                with xf.element(header.tag, header_attrib):
+                    for child in header:
+                        _write_indented(xf, f, child, level=2)
+                    header = None
+
+                    xf.write("\n    ")
+                    with xf.element(f"{{{AKN_NS}}}components"):
+                        for doc_eid, doc_xml in components:
+                            with _stage(generator.metrics, "serialisation", doc_eid):
+                                xf.write("\n      ")
+                                with xf.element(f"{{{AKN_NS}}}component", eId=f"cmp_{doc_eid}"):
+                                    _write_indented(xf, f, doc_xml, level=4)
+                                    xf.write("\n      ")
+                                xf.flush()
+                        xf.write("\n    ")
+                    xf.write("\n  ")
+                xf.write("\n")
+        f.write(b"\n")
+    print(f"Written: {output_path}")
+
+
+def _print_xml_preview(path: str, max_lines: int = 50):
+    """Print the first lines of a written XML file without re-serialising it."""
+    with open(path, encoding="utf-8") as f:
+        head = []
+        total = 0
+        for line in f:
+            if total < max_lines:
+                head.append(line.rstrip("\n"))
+            total += 1
+    print(f"\nXML preview (first {max_lines} lines of {total} total):")
+    for line in head:
+        print(line)
+    if total > max_lines:
+        print(f"... ({total - max_lines} more lines)")
+
+
+def write_individual_documents(final_acts: FinalActs, output_dir: str,
+                               metrics: Optional[ConversionMetrics] = None,
+                               references: Optional[ReferenceIndex] = None):
+    """Write each document as a separate AKN4UN XML file.
+
+    Documents in ``final_acts.unchanged`` keep their existing file untouched.
+    """
+    generator = AKNGenerator(final_acts, metrics=metrics, references=references)
+
+    for doc_eid, doc_xml in generator.iter_components(include_unchanged=False):
+        _write_individual_document(doc_eid, doc_xml, output_dir, metrics)
+
+
+def _write_individual_document(doc_eid: str, doc_xml: etree._Element, output_dir: str,
+                               metrics: Optional[ConversionMetrics] = None):
+    """Write one statement to ``output_dir/<doc_eid>.xml``."""
+    filepath = os.path.join(output_dir, f"{doc_eid}.xml")
+    with _stage(metrics, "serialisation", doc_eid):
+        root = etree.Element(f"{{{AKN_NS}}}akomaNtoso", nsmap=NSMAP)
+        root.append(doc_xml)
+        write_xml(root, filepath)
+
+
+# ---------------------------------------------------------------------------
+# Pipelined conversion
+# ---------------------------------------------------------------------------
+
+PIPELINE_QUEUE_SIZE = 4  # documents in flight between two pipeline stages
+
+_END = object()  # passed down the pipeline after the last document
+
+
+def _pipeline_stage(func, inbox: queue.Queue, outbox: queue.Queue, errors: list):
+    """Thread body: put ``func(item)`` on ``outbox`` for each item taken from ``inbox``.
+
+    Once any stage has failed, the remaining items are drained without
+    being processed, so that no upstream stage blocks on a full queue.
+    """
+    while True:
+        item = inbox.get()
+        if item is _END:
+            break
+        if errors:
+            continue
+        try:
+            outbox.put(func(item))
+        except BaseException as exc:  # re-raised by convert_pipelined
+            errors.append(exc)
+    outbox.put(_END)
+
+
+def convert_pipelined(extractor: PDFExtractor, output_dir: str,
+                      individual_dir: Optional[str] = None,
+                      metrics: Optional[ConversionMetrics] = None) -> FinalActs:
+    """Convert one PDF with extraction, parsing, XML generation and writing
+    running concurrently, connected by bounded queues.
+
+    The documents, their parts and the reference index all come from the
+    TOC, so the collection header is written before any page is read and
+    each statement is written (to the collection and, with
+    ``individual_dir``, to its own file) as soon as it is generated.
+    Extraction and parsing run in threads, generation in a third one and
+    writing in the calling thread. The output is the same as that of the
+    sequential conversion. Returns the parsed FinalActs.
+    """
+    start = time.perf_counter()
+    if metrics is not None:
+        metrics.concurrent = True
+    doc_parser = FinalActsParser(extractor, metrics=metrics)
+    ranges = doc_parser.document_ranges()
+    # Header-only documents stand in for the parsed ones until they arrive.
+    # Ranges are fed in collection order (grouped by part).
+    final_acts = doc_parser.assemble(ranges, [(doc_parser._header_item(e), "") for e, _ in ranges])
+    part_order = {part: i for i, part in enumerate(final_acts.parts)}
+    ranges.sort(key=lambda r: part_order[r[0].get("part", "other")])
+    slots = [(docs, i) for docs in final_acts.parts.values() for i in range(len(docs))]
+    generator = AKNGenerator(final_acts, metrics=metrics)
+
+    extracted, parsed, generated = (queue.Queue(PIPELINE_QUEUE_SIZE) for _ in range(3))
+    errors: list = []
+
+    def extract():
+        try:
+            for k, (entry, end_page) in enumerate(ranges):
+                if errors:
+                    break
+                extracted.put((k, entry, *doc_parser._extract_entry(entry, end_page)))
+        except BaseException as exc:
+            errors.append(exc)
+        finally:
+            extracted.put(_END)
+
+    def parse(item):
+        k, entry, *extracted = item
+        doc_item, fingerprint = doc_parser._parse_extracted(entry, *extracted)
+        docs, i = slots[k]
+        docs[i] = doc_item
+        final_acts.fingerprints[doc_parser._entry_eid(entry)] = fingerprint
+        return doc_item
+
+    def generate(doc_item):
+        doc_eid = generator._doc_eid(doc_item)
+        with _stage(metrics, "xml_generation", doc_eid):
+            return doc_eid, generator._generate_single_document(doc_item)
+
+    drained = threading.Event()
+    first_written = None
+
+    def components():
+        nonlocal first_written
+        while (item := generated.get()) is not _END:
+            yield item  # written to the collection before the generator resumes
+            if individual_dir:
+                _write_individual_document(*item, individual_dir, metrics)
+            if first_written is None:
+                first_written = time.perf_counter() - start
+        drained.set()
+
+    threads = [
+        threading.Thread(target=extract, name="extract"),
+        threading.Thread(target=_pipeline_stage, args=(parse, extracted, parsed, errors), name="parse"),
+        threading.Thread(target=_pipeline_stage, args=(generate, parsed, generated, errors), name="generate"),
+    ]
+    for thread in threads:
+        thread.start()
+    collection_path = os.path.join(output_dir, final_acts.collection_filename)
+    try:
+        write_collection(generator, collection_path, components=components())
+    except BaseException as exc:
+        errors.append(exc)
+        while not drained.is_set() and generated.get() is not _END:
+            pass
+    for thread in threads:
+        thread.join()
+    if metrics is not None:
+        metrics.concurrent = False
+    if errors:
+        raise errors[0]
+    if first_written is not None:
+        print(f"First document written after {first_written:.2f} s")
+    return final_acts
+
+
+# ---------------------------------------------------------------------------
+# Intermediate representation
+# ---------------------------------------------------------------------------
+
+IR_FORMAT_VERSION = 2
+
+# FinalActs string fields stored in the IR "acts" row
+_IR_ACTS_FIELDS = CONFERENCE_FIELDS + ("signatories_text", "declarations_text")
+
+# Columns of each IR table. Every table is an int32 array with one row per
+# item; the first column of a child table is the row of its parent, the
+# others are ids into the string table (footnote and table pages and table
+# row numbers are stored as is).
+_IR_TABLES = {
+    "parts": ("name",),
+    "documents": ("part", "doc_type", "number", "revision", "title", "enacting_formula"),
+    "preamble_sections": ("document", "keyword"),
+    "recitals": ("section", "label", "text"),
+    "operative_sections": ("document", "keyword"),
+    "paragraphs": ("section", "num", "text"),
+    "points": ("paragraph", "label", "text"),
+    "annexes": ("document", "text"),
+    "footnotes": ("document", "marker", "text", "page"),
+    "tables": ("document", "page"),
+    "table_cells": ("table", "row", "text"),
+    "modifications": ("document", "type", "source", "destination", "old", "new"),
+    "fingerprints": ("doc_eid", "fingerprint"),
+}
+
+
+def dump_ir(final_acts: FinalActs, path: str):
+    """Write ``final_acts`` to ``path`` in a columnar binary layout.
+
+    The dataclass tree is flattened into one integer table per level (see
+    ``_IR_TABLES``) plus a single de-duplicated UTF-8 string table, stored
+    uncompressed with ``np.savez`` so that loading is a handful of array
+    reads. ``final_acts.unchanged`` belongs to one incremental run and is
+    not stored.
+    """
+    strings: dict = {}
+
+    def sid(text: str) -> int:
+        return strings.setdefault(text, len(strings))
+
+    rows = {name: [] for name in _IR_TABLES}
+    for part_name, doc_items in final_acts.parts.items():
+        part = len(rows["parts"])
+        rows["parts"].append((sid(part_name),))
+        for d in doc_items:
+            doc = len(rows["documents"])
+            rows["documents"].append((part, sid(d.doc_type), sid(d.number), sid(d.revision),
+                                      sid(d.title), sid(d.enacting_formula)))
+            for sec in d.preamble_sections:
+                rows["recitals"].extend((len(rows["preamble_sections"]), sid(p.label), sid(p.text))
+                                        for p in sec.paragraphs)
+                rows["preamble_sections"].append((doc, sid(sec.keyword)))
+            for sec in d.operative_sections:
+                for para in sec.paragraphs:
+                    rows["points"].extend((len(rows["paragraphs"]), sid(p.label), sid(p.text))
+                                          for p in para.sub_paragraphs)
+                    rows["paragraphs"].append((len(rows["operative_sections"]), sid(para.num), sid(para.text)))
+                rows["operative_sections"].append((doc, sid(sec.keyword)))
+            rows["annexes"].extend((doc, sid(text)) for text in d.annexes)
+            rows["footnotes"].extend((doc, sid(n.marker), sid(n.text), n.page) for n in d.footnotes)
+            for table in d.tables:
+                rows["table_cells"].extend((len(rows["tables"]), r, sid(cell))
+                                           for r, row in enumerate(table.rows) for cell in row)
+                rows["tables"].append((doc, table.page))
+            rows["modifications"].extend((doc, sid(m.type), sid(m.source), sid(m.destination),
+                                          sid(m.old), sid(m.new)) for m in d.modifications)
+    rows["fingerprints"] = [(sid(k), sid(v)) for k, v in final_acts.fingerprints.items()]
+    acts = [sid(getattr(final_acts, name)) for name in _IR_ACTS_FIELDS]
+
+    lengths = np.fromiter((len(s) for s in strings), dtype=np.int64, count=len(strings))
+    offsets = np.zeros(len(strings) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    arrays = {
+        "format": np.array([IR_FORMAT_VERSION], dtype=np.int32),
+        "acts": np.array(acts, dtype=np.int32),
+        "strings": np.frombuffer("".join(strings).encode("utf-8"), dtype=np.uint8),
+        "string_offsets": offsets,  # in characters of the decoded string table
+    }
+    for name, columns in _IR_TABLES.items():
+        arrays[name] = np.array(rows[name], dtype=np.int32).reshape(-1, len(columns))
+    with open(path, "wb") as f:  # a file object keeps np.savez from appending ".npz"
+        np.savez(f, **arrays)
+
+
+def load_ir(path: str) -> FinalActs:
+    """Read a ``FinalActs`` written by ``dump_ir``.
+
+    Raises ValueError if the file is not an IR file of this format version.
+    """
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            version = int(data["format"][0])
+            if version != IR_FORMAT_VERSION:
+                raise ValueError(f"{path}: IR format {version}, expected {IR_FORMAT_VERSION}")
+            text = data["strings"].tobytes().decode("utf-8")
+            offsets = data["string_offsets"].tolist()
+            acts_row = data["acts"].tolist()
+            tables = {name: data[name].tolist() for name in _IR_TABLES}
+    except (KeyError, OSError) as exc:
+        raise ValueError(f"{path}: not an IR file ({exc})") from exc
+
+    s = [text[a:b] for a, b in zip(offsets, offsets[1:])]
+    final_acts = FinalActs(**{name: s[i] for name, i in zip(_IR_ACTS_FIELDS, acts_row)})
+    parts = [final_acts.parts.setdefault(s[name], []) for name, in tables["parts"]]
+
+    docs = []
+    for part, doc_type, number, revision, title, formula in tables["documents"]:
+        doc_item = DocumentItem(doc_type=s[doc_type], number=s[number], revision=s[revision],
+                                title=s[title], enacting_formula=s[formula])
+        parts[part].append(doc_item)
+        docs.append(doc_item)
+    preamble = []
+    for doc, keyword in tables["preamble_sections"]:
+        preamble.append(PreambleSection(keyword=s[keyword]))
+        docs[doc].preamble_sections.append(preamble[-1])
+    for sec, label, text_id in tables["recitals"]:
+        preamble[sec].paragraphs.append(SubParagraph(label=s[label], text=s[text_id]))
+    operative = []
+    for doc, keyword in tables["operative_sections"]:
+        operative.append(OperativeSection(keyword=s[keyword]))
+        docs[doc].operative_sections.append(operative[-1])
+    paragraphs = []
+    for sec, num, text_id in tables["paragraphs"]:
+        paragraphs.append(NumberedParagraph(num=s[num], text=s[text_id]))
+        operative[sec].paragraphs.append(paragraphs[-1])
+    for para, label, text_id in tables["points"]:
+        paragraphs[para].sub_paragraphs.append(SubParagraph(label=s[label], text=s[text_id]))
+    for doc, text_id in tables["annexes"]:
+        docs[doc].annexes.append(s[text_id])
+    for doc, marker, text_id, page in tables["footnotes"]:
+        docs[doc].footnotes.append(Footnote(marker=s[marker], text=s[text_id], page=page))
+    doc_tables = []
+    for doc, page in tables["tables"]:
+        doc_tables.append(Table(page=page))
+        docs[doc].tables.append(doc_tables[-1])
+    for table, row, text_id in tables["table_cells"]:
+        table_rows = doc_tables[table].rows
+        if row == len(table_rows):
+            table_rows.append([])
+        table_rows[row].append(s[text_id])
+    for doc, *mod in tables["modifications"]:
+        docs[doc].modifications.append(TextualMod(*(s[i] for i in mod)))
+    final_acts.fingerprints = {s[k]: s[v] for k, v in tables["fingerprints"]}
+    return final_acts
+
+
+# ---------------------------------------------------------------------------
+# Schema validation
+# ---------------------------------------------------------------------------
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "akomantoso30.xsd")
+
+_SCHEMAS = {}  # (path, mtime) -> compiled XMLSchema, per process
+
+
+def load_schema(path: str = SCHEMA_PATH) -> etree.XMLSchema:
+    """Compile the AKN schema once per process (about 0.4 s for the 245 KB XSD).
+
+    A compiled XMLSchema cannot be pickled or persisted, so each worker
+    process compiles it once in its initializer and reuses it for every
+    statement it validates.
+    """
+    path = os.path.abspath(path)
+    key = (path, os.path.getmtime(path))
+    if key not in _SCHEMAS:
+        _SCHEMAS[key] = etree.XMLSchema(etree.parse(path))
+    return _SCHEMAS[key]
+
+
+def iter_statements(xml_path: str):
+    """Yield (doc eId, standalone akomaNtoso bytes) for each statement in a file.
+
+    Collection statements take their eId from the enclosing component;
+    an individual file's statement takes the file name.
+    """
+    stem = os.path.splitext(os.path.basename(xml_path))[0]
+    for _, statement in etree.iterparse(xml_path, events=("end",), tag=f"{{{AKN_NS}}}statement",
+                                        remove_blank_text=True):
+        parent = statement.getparent()
+        component_eid = parent.get("eId", "") if parent is not None else ""
+        doc_eid = component_eid[len("cmp_"):] if component_eid.startswith("cmp_") else stem
+        root = etree.Element(f"{{{AKN_NS}}}akomaNtoso", nsmap=NSMAP)
+        root.append(statement)  # moves the statement out of the parsed tree
+        yield doc_eid, etree.tostring(root)
+
+
+def validate_statement(doc_eid: str, xml_bytes: bytes, schema_path: str = SCHEMA_PATH) -> tuple:
+    """Validate one standalone statement; return (doc_eid, errors).
+
+    Each error is reported against the eId of the nearest enclosing
+    element that has one (the statement itself if none does).
+    """
+    schema = load_schema(schema_path)
+    tree = etree.ElementTree(etree.fromstring(xml_bytes))
+    if schema.validate(tree):
+        return doc_eid, []
+
+    errors = []
+    for entry in schema.error_log:
+        eid = ""
+        nodes = tree.xpath(entry.path) if entry.path else []
+        node = nodes[0] if nodes and isinstance(nodes[0], etree._Element) else None
+        while node is not None and not eid:
+            eid = node.get("eId", "")
+            node = node.getparent()
+        message = entry.message.replace(f"{{{AKN_NS}}}", "")
+        errors.append({"eId": eid, "path": entry.path, "message": message})
+    return doc_eid, errors
+
+
+def validate_files(xml_paths: list, workers: int = 1, schema_path: str = SCHEMA_PATH,
+                   metrics: Optional[ConversionMetrics] = None) -> dict:
+    """Validate every statement of ``xml_paths``; return {path: {doc eId: errors}}.
+
+    With ``workers > 1`` statements are validated in a process pool whose
+    workers compile the schema once each.
+    """
+    report = {xml_path: {} for xml_path in xml_paths}
+    tasks = [(xml_path, doc_eid, blob)
+             for xml_path in xml_paths for doc_eid, blob in iter_statements(xml_path)]
+    with _stage(metrics, "validation"):
+        if workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=workers, initializer=load_schema,
+                                     initargs=(schema_path,)) as pool:
+                results = list(pool.map(
+                    validate_statement,
+                    [doc_eid for _, doc_eid, _ in tasks],
+                    [blob for _, _, blob in tasks],
+                    [schema_path] * len(tasks),
+                    chunksize=max(1, len(tasks) // (workers * 4)),
+                ))
+        else:
+            results = [validate_statement(doc_eid, blob, schema_path) for _, doc_eid, blob in tasks]
+    for (xml_path, _, _), (doc_eid, errors) in zip(tasks, results):
+        report[xml_path][doc_eid] = errors
+    return report
+
+
+def print_validation_report(report: dict, max_errors: int = 5) -> int:
+    """Print invalid statements with their first errors; return the error count."""
+    total_errors = 0
+    for xml_path, documents in report.items():
+        invalid = {doc_eid: errors for doc_eid, errors in documents.items() if errors}
+        print(f"Validated: {xml_path} ({len(documents) - len(invalid)}/{len(documents)} statements valid)")
+        for doc_eid, errors in invalid.items():
+            total_errors += len(errors)
+            print(f"  {doc_eid}: {len(errors)} error(s)")
+            for error in errors[:max_errors]:
+                print(f"    [{error['eId'] or doc_eid}] {error['message']}")
+            if len(errors) > max_errors:
+                print(f"    ... and {len(errors) - max_errors} more")
+    return total_errors
+
+
+# ---------------------------------------------------------------------------
+# Batch conversion
+# ---------------------------------------------------------------------------
+
+def load_batch_manifest(path: str) -> list:
+    """Read a JSON list of conferences: {"pdf": ..., <CONFERENCE_FIELDS>...}.
+
+    Every value must be a string: the year and date are matched as text
+    against cross-references. Relative PDF paths are resolved against the
+    manifest's directory.
+    """
+    with open(path, encoding="utf-8") as f:
+        conferences = json.load(f)
+    base = os.path.dirname(os.path.abspath(path))
+    for conf in conferences:
+        unknown = set(conf) - set(CONFERENCE_FIELDS) - {"pdf"}
+        if "pdf" not in conf or unknown:
+            raise ValueError(
+                f"Invalid manifest entry {conf!r}: needs 'pdf' and may only set {', '.join(CONFERENCE_FIELDS)}"
+            )
+        not_text = [key for key, value in conf.items() if not isinstance(value, str)]
+        if not_text:
+            raise ValueError(
+                f"Invalid manifest entry {conf!r}: the value of {', '.join(not_text)} must be a string"
+            )
+        conf["pdf"] = os.path.join(base, conf["pdf"])
+    return conferences
+
+
+def convert_batch(conferences: list, output_dir: str, workers: int = 1,
+                  individual: bool = False, layout: bool = False,
+                  page_cache_path: Optional[str] = None) -> list:
+    """Convert several Final Acts PDFs, sharing one process pool.
+
+    The documents of all conferences are cut into shards of one common size
+    and submitted together, so the pool stays busy across PDF boundaries
+    instead of draining at the end of each conference. Cross-references are
+    resolved against all conferences of the batch. Each conference is
+    written to ``output_dir/<slug>/``; returns the collection paths.
+    """
+    page_cache = PageTextCache(page_cache_path) if page_cache_path else None
+    jobs = []  # (parser, ranges)
+    for conf in conferences:
+        extractor = PDFExtractor(conf["pdf"], cache=page_cache, layout=layout)
+        parser = FinalActsParser(extractor, conference={k: v for k, v in conf.items() if k != "pdf"})
+        jobs.append((parser, parser.document_ranges()))
+        print(f"Queued: {conf['pdf']} ({len(jobs[-1][1])} documents)")
+
+    all_acts = []
+    if workers > 1:
+        total = sum(len(ranges) for _, ranges in jobs)
+        size = max(1, -(-total // (workers * 4)))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                [
+                    pool.submit(_parse_document_shard, parser.extractor.pdf_path, shard,
+                                page_cache_path, parser.extractor.pdf_sha256, False, None,
+                                layout, parser.conference)
+                    for shard in parser._shards(ranges, -(-len(ranges) // size))
+                ]
+                for parser, ranges in jobs
+            ]
+            for (parser, ranges), shard_futures in zip(jobs, futures):
+                results = [r for future in shard_futures for r in future.result()[0]]
+                all_acts.append(parser.assemble(ranges, results))
+    else:
+        for parser, ranges in jobs:
+            results = [parser._parse_entry(entry, end_page) for entry, end_page in ranges]
+            all_acts.append(parser.assemble(ranges, results))
+
+    for parser, _ in jobs:
+        parser.extractor.close()
+    if page_cache is not None:
+        page_cache.close()
+
+    linked = link_version_chains(all_acts)
+    print(f"Compared {linked} documents with their previous version")
+
+    references = ReferenceIndex.from_final_acts(*all_acts)
+    written = []
+    for acts in all_acts:
+        conf_dir = os.path.join(output_dir, acts.slug)
+        os.makedirs(conf_dir, exist_ok=True)
+        generator = AKNGenerator(acts, references=references)
+        collection_path = os.path.join(conf_dir, acts.collection_filename)
+        write_collection(generator, collection_path)
+        if individual:
+            individual_dir = os.path.join(conf_dir, "individual")
+            os.makedirs(individual_dir, exist_ok=True)
+            write_individual_documents(acts, individual_dir, references=references)
+        written.append(collection_path)
+    return written
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convert ITU Final Acts PDF to AKN4UN XML"
+    )
+    parser.add_argument("input_pdf", nargs="?", help="Path to the Final Acts PDF file")
+    parser.add_argument(
+        "--batch",
+        default=None,
+        help="JSON manifest of several Final Acts PDFs with per-conference metadata; "
+             "converts all of them in one shared worker pool",
+    )
+    parser.add_argument(
+        "--output-dir",
+        default=None,
+        help="Output directory (default: same as input PDF)",
+    )
+    parser.add_argument(
+        "--individual",
+        action="store_true",
+        help="Also write each document as a separate XML file",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes used to parse documents (default: 1)",
+    )
+    parser.add_argument(
+        "--page-cache",
+        default=None,
+        help="SQLite file caching extracted page text (page spans with --layout) across runs",
+    )
+    parser.add_argument(
+        "--layout",
+        action="store_true",
+        help="Drop page headers, footers and footnotes by font size and position "
+             "instead of text heuristics",
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="Run extraction, parsing, XML generation and writing as concurrent "
+             "stages, writing each document as soon as it is ready",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only regenerate individual documents whose source text or the "
+             "converter changed since the previous run (implies --individual)",
+    )
+    parser.add_argument(
+        "--dump-ir",
+        default=None,
+        help="Also write the parsed document structure to this file (binary IR)",
+    )
+    parser.add_argument(
+        "--from-ir",
+        default=None,
+        help="Generate from an IR file written by --dump-ir instead of parsing a PDF",
+    )
+    parser.add_argument(
+        "--validate",
+        action="store_true",
+        help="Validate every written statement against akomantoso30.xsd and report "
+             "errors by eId",
+    )
+    parser.add_argument(
+        "--validation-json",
+        default=None,
+        help="Write the validation report ({file: {document: [errors]}}) as JSON "
+             "(implies --validate)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print per-stage wall/CPU time, peak memory and the slowest documents",
+    )
+    parser.add_argument(
+        "--metrics-json",
+        default=None,
+        help="Write per-stage and per-document timings and match counts as JSON",
+    )
+    args = parser.parse_args()
+
+    if args.batch:
+        if (args.input_pdf or args.incremental or args.profile or args.metrics_json
+                or args.dump_ir or args.from_ir or args.pipeline):
+            parser.error("--batch cannot be combined with input_pdf, --incremental, "
+                         "--profile, --metrics-json, --dump-ir, --from-ir or --pipeline")
+        try:
+            conferences = load_batch_manifest(args.batch)
+        except (OSError, ValueError) as exc:
+            print(f"Error: {exc}")
+            sys.exit(1)
+        output_dir = args.output_dir or os.path.dirname(os.path.abspath(args.batch))
+        written = convert_batch(conferences, output_dir, workers=args.workers,
+                                individual=args.individual, layout=args.layout,
+                                page_cache_path=args.page_cache)
+        print(f"\nBatch complete: {len(written)} conferences")
+        if args.validate or args.validation_json:
+            print("\nValidating against akomantoso30.xsd...")
+            report = validate_files(written, workers=args.workers)
+            print_validation_report(report)
+            if args.validation_json:
+                with open(args.validation_json, "w", encoding="utf-8") as f:
+                    json.dump(report, f, indent=2)
+        return
+    if args.pipeline and (args.from_ir or args.incremental or args.workers > 1):
+        parser.error("--pipeline cannot be combined with --from-ir, --incremental or --workers")
+    if args.incremental and args.dump_ir:
+        # unchanged documents are not parsed, so the IR would hold only their headers
+        parser.error("--dump-ir cannot be combined with --incremental")
+    if args.from_ir:
+        if args.input_pdf or args.incremental or args.dump_ir:
+            parser.error("--from-ir cannot be combined with input_pdf, --incremental or --dump-ir")
+    elif not args.input_pdf:
+        parser.error("input_pdf is required unless --batch or --from-ir is given")
+
+    source = args.from_ir or args.input_pdf
+    if not os.path.exists(source):
+        print(f"Error: File not found: {source}")
+        sys.exit(1)
+
+    output_dir = args.output_dir or os.path.dirname(os.path.abspath(source))
+    os.makedirs(output_dir, exist_ok=True)
+    individual_dir = os.path.join(output_dir, "individual")
+    if args.incremental:
+        args.individual = True
+    manifest = load_manifest(individual_dir) if args.incremental else None
+
+    metrics = ConversionMetrics() if (args.profile or args.metrics_json) else None
+    if args.from_ir:
+        print(f"Loading IR: {args.from_ir}")
+        try:
+            with _stage(metrics, "ir"):
+                final_acts = load_ir(args.from_ir)
+        except ValueError as exc:
+            print(f"Error: {exc}")
+            sys.exit(1)
+    else:
+        print(f"Reading PDF: {args.input_pdf}")
+        page_cache = PageTextCache(args.page_cache) if args.page_cache else None
+        extractor = PDFExtractor(args.input_pdf, cache=page_cache, layout=args.layout)
+
+        if args.pipeline:
+            print("Converting with pipelined extract/parse/generate/write stages...")
+            if args.individual:
+                os.makedirs(individual_dir, exist_ok=True)
+            final_acts = convert_pipelined(extractor, output_dir,
+                                           individual_dir if args.individual else None,
+                                           metrics=metrics)
+        else:
+            print("Parsing document structure...")
+            doc_parser = FinalActsParser(extractor, metrics=metrics)
+            final_acts = doc_parser.parse(workers=args.workers, manifest=manifest)
+        extractor.close()
+        if page_cache is not None:
+            page_cache.close()
+
+    if args.dump_ir:
+        with _stage(metrics, "ir"):
+            dump_ir(final_acts, args.dump_ir)
+        print(f"Written IR: {args.dump_ir} ({os.path.getsize(args.dump_ir) / 1024:.1f} KB)")
+
+    total_docs = sum(len(docs) for docs in final_acts.parts.values())
+    print(f"Found {total_docs} documents across {len(final_acts.parts)} parts:")
+    for part_name, docs in final_acts.parts.items():
+        print(f"  {part_name}: {len(docs)} documents")
+        for d in docs[:3]:
+            print(f"    - {d.doc_type} {d.number}: {d.title[:60]}")
+        if len(docs) > 3:
+            print(f"    ... and {len(docs) - 3} more")
+    if args.incremental:
+        print(f"Unchanged since previous run: {len(final_acts.unchanged)} documents")
+
+    collection_path = os.path.join(output_dir, final_acts.collection_filename)
+    if not args.pipeline:
+        # Generate the collection XML
+        print("\nGenerating AKN4UN XML...")
+        generator = AKNGenerator(final_acts, metrics=metrics, previous_dir=individual_dir)
+        write_collection(generator, collection_path)
+
+    # Optionally write individual files
+    if args.individual and not args.pipeline:
+        os.makedirs(individual_dir, exist_ok=True)
+        print(f"\nWriting individual documents to: {individual_dir}")
+        write_individual_documents(final_acts, individual_dir, metrics=metrics)
+        if args.incremental:
+            write_manifest(final_acts, individual_dir)
+
+    print("\nConversion complete!")
+    print(f"Collection file: {collection_path}")
+
+    # Print a sample of the generated XML
+    _print_xml_preview(collection_path)
+
+    if args.validate or args.validation_json:
+        print("\nValidating against akomantoso30.xsd...")
+        report = validate_files([collection_path], workers=args.workers, metrics=metrics)
+        print_validation_report(report)
+        if args.validation_json:
+            with open(args.validation_json, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+
+    if metrics is not None:
+        if args.profile:
+            metrics.print_summary()
+        if args.metrics_json:
+            metrics.write_json(args.metrics_json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Check the fused text normaliser against the chained re.sub() passes it replaced.
+
+Inputs are the text of every statement of the shipped
+pp18_final_acts_akn.xml, one line per text node, once as written and once
+with typographic dashes and quotes, space and newline runs and invalid
+characters put back in at random (seeded).
+
+Usage:
+    python -m unittest test_normalizer
+"""
+
+import random
+import re
+import unittest
+from pathlib import Path
+from xml.etree import ElementTree as ET
+
+from itu_final_acts_to_akn import FinalActsParser
+
+SHIPPED_COLLECTION = Path(__file__).resolve().parent / "pp18_final_acts_akn.xml"
+
+
+def _chained_normalize(text: str) -> str:
+    """The normaliser as six chained re.sub() passes, before it was fused."""
+    text = re.sub(r"\u2013|\u2014", "-", text)
+    text = re.sub(r"\u201c|\u201d", '"', text)
+    text = re.sub(r"\u2018|\u2019", "'", text)
+    text = re.sub(r"[ \t]+", " ", text)
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    text = re.sub(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]", "", text)
+    return text.strip()
+
+
+# What the PDF text layer has and the converted XML no longer does
+_PERTURBATIONS = {
+    "-": ["\u2013", "\u2014"],
+    '"': ["\u201c", "\u201d"],
+    "'": ["\u2018", "\u2019"],
+    " ": ["  ", "\t", " \t ", " \x0b ", "\x01", " \x85"],
+    "\n": ["\n\n\n", "\n \n\n\n", "\n\x0c\n\n", "\n\t\n"],
+}
+
+
+def _perturb(text: str, rng: random.Random) -> str:
+    return "".join(
+        rng.choice(_PERTURBATIONS[ch]) if ch in _PERTURBATIONS and rng.random() < 0.1 else ch
+        for ch in text
+    )
+
+
+def _statement_texts(xml_path: Path) -> list:
+    texts = []
+    for _, elem in ET.iterparse(str(xml_path)):
+        if elem.tag.endswith("}statement"):
+            texts.append("\n".join(t.strip() for t in elem.itertext() if t.strip()))
+            elem.clear()
+    return texts
+
+
+class NormalizeTextTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.texts = _statement_texts(SHIPPED_COLLECTION)
+        cls.parser = object.__new__(FinalActsParser)  # the normaliser needs no PDF
+
+    def assertMatchesChained(self, inputs):
+        self.assertTrue(inputs)
+        for text in inputs:
+            self.assertEqual(self.parser._normalize_text(text), _chained_normalize(text))
+
+    def test_statements_as_written(self):
+        self.assertMatchesChained(self.texts)
+
+    def test_statements_with_pdf_artifacts(self):
+        rng = random.Random(0)
+        self.assertMatchesChained([_perturb(text, rng) for text in self.texts])
+
+
+if __name__ == "__main__":
+    unittest.main()